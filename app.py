@@ -1,10 +1,22 @@
+import time
+_script_start = time.perf_counter()
+
+import importlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
-import folium
-from streamlit_folium import folium_static
-import plotly.express as px
-import joblib
-import os
+import numpy as np
+# folium, streamlit_folium, plotly, joblib (sklearn) ve map_layers (branca) ağır
+# modüllerdir; ilk çizimi geciktirmemek için ihtiyaç duyan panelde yüklenirler
+from filter_index import FilterIndex
+from spatial_tiles import SpatialTileIndex
+from top_k import TopKIndex
+from dashboard_views import DashboardViews
+from compiled_forest import CompiledForest
+from storage import load_dataset
+import metrics
 
 # Sayfa yapılandırması
 st.set_page_config(
@@ -13,29 +25,119 @@ st.set_page_config(
     layout="wide"
 )
 
+# Süreç başına bir kez doldurulan başlangıç süreleri (sn)
+@st.cache_resource
+def startup_timings():
+    return {}
+
+startup_timings().setdefault('imports', time.perf_counter() - _script_start)
+
+def lazy_import(name):
+    """Modülü ilk ihtiyaçta içe aktar; ilk yükleme süresini kaydet"""
+    if name in sys.modules:
+        return importlib.import_module(name)
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    startup_timings()[f'import {name}'] = time.perf_counter() - start
+    return module
+
 # Başlık
 st.title("☀️ EcoHalt Solar - Durak Analizi")
 st.markdown("Berlin'deki otobüs ve tramvay duraklarının güneş enerjisi potansiyeli analizi")
 
 # Model ve scaler'ı yükle
-@st.cache_resource
+# Derlenmiş model varsa (train_model.save_model üretir) scaler eşiklere gömülüdür
+# ve sklearn yüklenmez; yoksa joblib modeline geri dönülür
 def load_model():
     folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
+    compiled_path = os.path.join(folder_path, "solar_stop_model_compiled.npz")
+    if os.path.exists(compiled_path):
+        model = CompiledForest.load(compiled_path)
+        return model, None, model.features
+    joblib = importlib.import_module('joblib')
     model = joblib.load(os.path.join(folder_path, "solar_stop_model.joblib"))
     scaler = joblib.load(os.path.join(folder_path, "solar_stop_scaler.joblib"))
     with open(os.path.join(folder_path, "model_features.txt"), 'r') as f:
         features = f.read().splitlines()
     return model, scaler, features
 
-# Verileri yükle
-@st.cache_data
+# Model sayfa çizilirken arka planda yüklenir (süreç başına bir kez);
+# tahmin ve özellik önemi panelleri yalnızca hazır olmasını bekler
+@st.cache_resource
+def model_prewarm():
+    timings = startup_timings()
+
+    def load():
+        start = time.perf_counter()
+        try:
+            result = load_model()
+        except Exception as e:
+            print(f"Model yüklenemedi: {str(e)}")
+            raise
+        timings['model'] = time.perf_counter() - start
+        # 'model' aşaması yalnızca burada raporlanır (ilk çalıştırma özeti bunu atlar)
+        metrics.observe('app_startup_seconds', timings['model'], phase='model')
+        print(f"Model arka planda yüklendi ({timings['model'] * 1000:.0f} ms)")
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-prewarm')
+    future = executor.submit(load)
+    executor.shutdown(wait=False)
+    return future
+
+def model_future():
+    """
+    Önbellekteki model yüklemesi. Yükleme hata verdiyse (ör. dağıtım sırasında
+    dosya eksik/yarım) önbellek temizlenir ve yeniden denenir; aksi halde hata
+    süreç yeniden başlayana kadar kalıcı olurdu.
+    """
+    future = model_prewarm()
+    if future.done() and future.exception() is not None:
+        model_prewarm.clear()
+        future = model_prewarm()
+    return future
+
+# Verileri yükle, filtre ve uzamsal indeksleri bir kez kur
+# (indeksler her etkileşimde kopyalanmasın diye cache_resource kullanılıyor)
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("GTFS/enhanced_solar_analysis.csv")
-    return df
+    start = time.perf_counter()
+    df = load_dataset("GTFS/enhanced_solar_analysis.csv", columns=[
+        'stop_name', 'stop_lat', 'stop_lon', 'irradiation_kWh',
+        'metro_distance', 'passenger_density', 'suitability_score'
+    ])
+    df['stop_lat'] = pd.to_numeric(df['stop_lat'], errors='coerce')
+    df['stop_lon'] = pd.to_numeric(df['stop_lon'], errors='coerce')
+    filter_index = FilterIndex(
+        df, ['irradiation_kWh', 'suitability_score', 'metro_distance'], text_col='stop_name'
+    )
+    tile_index = SpatialTileIndex(df)
+    top_index = TopKIndex(df, 'suitability_score')
+    # Filtre durumuna göre önbelleklenen özetler (ortalamalar, en iyi 5, histogram)
+    views = DashboardViews(df, filter_index, top_index, hist_col='irradiation_kWh', bins=20)
+    startup_timings()['data'] = time.perf_counter() - start
+    return df, filter_index, tile_index, top_index, views
+
+# Özellik önemlilikleri filtrelere bağlı değil: grafik bir kez oluşturulur
+@st.cache_resource
+def feature_importance_figure():
+    px = lazy_import('plotly.express')
+    model, _, features = model_future().result()
+    feature_importance = pd.DataFrame({
+        'feature': features,
+        'importance': model.feature_importances_
+    }).sort_values('importance', ascending=True)
+    return px.bar(
+        feature_importance,
+        x='importance',
+        y='feature',
+        orientation='h',
+        title='Özellik Önemlilikleri'
+    )
 
-# Ana veri setini yükle
-df = load_data()
-model, scaler, features = load_model()
+# Model yüklemesini başlat, ardından ana veri setini yükle
+model_future()
+df, filter_index, tile_index, top_index, views = load_data()
 
 # Sidebar filtreleri
 st.sidebar.header("Filtreler")
@@ -71,6 +173,12 @@ max_metro_distance = st.sidebar.number_input(
     value=int(df['metro_distance'].max())
 )
 
+# Harita modu: büyük veri setlerinde yalnızca görünüm alanındaki duraklar gönderilir
+map_mode = st.sidebar.radio(
+    "Harita Modu",
+    ["Tüm duraklar", "Görünüm alanı (büyük veri)"]
+)
+
 # Yeni durak tahmini
 st.sidebar.header("Yeni Durak Tahmini")
 st.sidebar.markdown("Yeni bir durak için uygunluk tahmini yapın:")
@@ -104,88 +212,63 @@ if st.sidebar.button("Tahmin Yap"):
         'metro_distance': [new_metro_distance]
     })
     
-    # Verileri normalize et
-    X_new = scaler.transform(new_stop[features])
-    
-    # Tahmin yap
-    probability = model.predict_proba(X_new)[0][1]
-    threshold = 0.3  # Olasılık eşiği
-    prediction = int(probability > threshold)
-    
-    # Sonuçları göster
-    st.sidebar.markdown("---")
-    st.sidebar.markdown("### Tahmin Sonucu")
-    st.sidebar.markdown(f"**Uygunluk:** {'✅ Uygun' if prediction == 1 else '❌ Uygun Değil'}")
-    st.sidebar.markdown(f"**Uygunluk Olasılığı:** {probability:.2%}")
-
-# Filtreleri uygula
-mask = (
-    df['stop_name'].str.contains(stop_name, case=False, na=False, regex=False) &
-    (df['irradiation_kWh'] >= irradiation_range[0]) &
-    (df['irradiation_kWh'] <= irradiation_range[1]) &
-    (df['suitability_score'] >= score_range[0]) &
-    (df['suitability_score'] <= score_range[1]) &
-    (df['metro_distance'] <= max_metro_distance)
-)
-filtered_df = df[mask]
+    model = None
+    with st.spinner("Model yükleniyor..."):
+        try:
+            model, scaler, features = model_future().result()
+        except Exception as e:
+            st.sidebar.error(f"Model yüklenemedi, lütfen tekrar deneyin: {str(e)}")
+
+    if model is not None:
+        # Verileri normalize et (derlenmiş modelde ölçekleme eşiklere gömülü)
+        X_new = new_stop[features].to_numpy() if scaler is None else scaler.transform(new_stop[features])
+        
+        # Tahmin yap
+        with metrics.timer('predict_proba', source='app'):
+            probability = model.predict_proba(X_new)[0][1]
+        threshold = 0.3  # Olasılık eşiği
+        prediction = int(probability > threshold)
+        
+        # Sonuçları göster
+        st.sidebar.markdown("---")
+        st.sidebar.markdown("### Tahmin Sonucu")
+        st.sidebar.markdown(f"**Uygunluk:** {'✅ Uygun' if prediction == 1 else '❌ Uygun Değil'}")
+        st.sidebar.markdown(f"**Uygunluk Olasılığı:** {probability:.2%}")
+
+# Filtreleri uygula (indeks üzerinden ikili arama + n-gram araması);
+# aynı filtre durumu tekrar gelirse sonuçlar önbellekten döner
+filter_view = views.view(stop_name, {
+    'irradiation_kWh': irradiation_range,
+    'suitability_score': score_range,
+    'metro_distance': (None, max_metro_distance),
+})
+positions = filter_view['positions']
+filtered_df = df.iloc[positions]
 
 # İki sütunlu layout
 col1, col2 = st.columns([2, 1])
 
-with col1:
-    st.subheader("Durak Haritası")
-    # Sadece geçerli ve sayısal koordinatlara sahip satırları al
-    df_valid = filtered_df.dropna(subset=['stop_lat', 'stop_lon']).copy()
-    df_valid = df_valid[
-        df_valid['stop_lat'].apply(lambda x: pd.notnull(x) and isinstance(x, (int, float))) &
-        df_valid['stop_lon'].apply(lambda x: pd.notnull(x) and isinstance(x, (int, float)))
-    ]
-
-    if not df_valid.empty:
-        center_lat = df_valid['stop_lat'].mean()
-        center_lon = df_valid['stop_lon'].mean()
-        m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
+STOP_POPUP_FIELDS = [
+    ('Güneşlenme', 'irradiation_kWh', 1, ' kWh/yıl'),
+    ('Metro Uzaklığı', 'metro_distance', 0, ' m'),
+    ('Yolcu Yoğunluğu', 'passenger_density', 1, ''),
+    ('Uygunluk Skoru', 'suitability_score', 1, ''),
+]
 
-        for idx, row in df_valid.iterrows():
-            # Satırda NaN veya tip hatası varsa marker ekleme
-            if pd.isnull(row['stop_lat']) or pd.isnull(row['stop_lon']):
-                continue
-            if not isinstance(row['stop_lat'], (int, float)) or not isinstance(row['stop_lon'], (int, float)):
-                continue
-
-            popup_content = f"""
-            <div style='font-family: Arial; width: 200px;'>
-                <h4 style='margin-bottom: 5px;'>{row['stop_name']}</h4>
-                <p style='margin: 2px 0;'>Güneşlenme: {row['irradiation_kWh']:.1f} kWh/yıl</p>
-                <p style='margin: 2px 0;'>Metro Uzaklığı: {row['metro_distance']:.0f} m</p>
-                <p style='margin: 2px 0;'>Yolcu Yoğunluğu: {row['passenger_density']:.1f}</p>
-                <p style='margin: 2px 0;'>Uygunluk Skoru: {row['suitability_score']:.1f}</p>
-            </div>
-            """
-            folium.CircleMarker(
-                location=[row['stop_lat'], row['stop_lon']],
-                radius=5,
-                popup=folium.Popup(popup_content, max_width=300),
-                color='red' if row['suitability_score'] > 80 else 'orange' if row['suitability_score'] > 50 else 'green',
-                fill=True,
-                fill_opacity=0.7,
-                tooltip=row['stop_name']
-            ).add_to(m)
-
-        folium_static(m, width=800, height=600)
-    else:
-        st.warning("⚠️ Uygulanan filtrelerle eşleşen geçerli konumda durak bulunamadı. Lütfen filtreleri genişletin.")
+def score_colors(score):
+    return np.select([score > 80, score > 50], ['red', 'orange'], default='green')
 
+# Hafif paneller önce: istatistikler harita modülleri yüklenmeden çizilir
 with col2:
     # İstatistikler
     st.subheader("İstatistikler")
-    st.metric("Filtrelenmiş Durak Sayısı", len(filtered_df))
-    st.metric("Ortalama Güneşlenme", f"{filtered_df['irradiation_kWh'].mean():.1f} kWh/yıl")
-    st.metric("Ortalama Uygunluk Skoru", f"{filtered_df['suitability_score'].mean():.1f}")
+    st.metric("Filtrelenmiş Durak Sayısı", filter_view['count'])
+    st.metric("Ortalama Güneşlenme", f"{filter_view['means']['irradiation_kWh']:.1f} kWh/yıl")
+    st.metric("Ortalama Uygunluk Skoru", f"{filter_view['means']['suitability_score']:.1f}")
     
-    # En iyi 5 durak
+    # En iyi 5 durak (önceden sıralanmış indeksten; aynı kavşaktaki peronlar tek yer sayılır)
     st.subheader("En İyi 5 Durak")
-    top_5 = filtered_df.nlargest(5, 'suitability_score')
+    top_5 = df.iloc[filter_view['top']]
     for idx, row in top_5.iterrows():
         st.markdown(f"""
         **{row['stop_name']}**  
@@ -194,32 +277,110 @@ with col2:
         ---
         """)
     
+with col1:
+    st.subheader("Durak Haritası")
+    folium = lazy_import('folium')
+    streamlit_folium = lazy_import('streamlit_folium')
+    add_stop_layer = lazy_import('map_layers').add_stop_layer
+    # Sadece geçerli koordinatlara sahip satırları al
+    df_valid = filtered_df.dropna(subset=['stop_lat', 'stop_lon'])
+
+    if df_valid.empty:
+        st.warning("⚠️ Uygulanan filtrelerle eşleşen geçerli konumda durak bulunamadı. Lütfen filtreleri genişletin.")
+    elif map_mode == "Tüm duraklar":
+        center_lat = df_valid['stop_lat'].mean()
+        center_lon = df_valid['stop_lon'].mean()
+        m = folium.Map(location=[center_lat, center_lon], zoom_start=12)
+
+        add_stop_layer(
+            m, df_valid, colors=score_colors(df_valid['suitability_score']), radius=5,
+            popup_fields=STOP_POPUP_FIELDS, tooltip='stop_name'
+        )
+
+        with metrics.timer('map_render', mode='all'):
+            streamlit_folium.folium_static(m, width=800, height=600)
+    else:
+        # Son harita durumu (sınırlar/yakınlaştırma) st_folium tarafından saklanır
+        view = st.session_state.get('viewport_map') or {}
+        if view.get('bounds') and view['bounds'].get('_southWest'):
+            sw, ne = view['bounds']['_southWest'], view['bounds']['_northEast']
+            bounds = (sw['lat'], sw['lng'], ne['lat'], ne['lng'])
+            center = [view['center']['lat'], view['center']['lng']]
+            zoom = view['zoom']
+        else:
+            bounds = (df_valid['stop_lat'].min(), df_valid['stop_lon'].min(),
+                      df_valid['stop_lat'].max(), df_valid['stop_lon'].max())
+            center = [df_valid['stop_lat'].mean(), df_valid['stop_lon'].mean()]
+            zoom = 12
+
+        kind, result = tile_index.query(
+            bounds, zoom, positions=positions, values=df['suitability_score']
+        )
+        m = folium.Map(location=center, zoom_start=zoom)
+        if kind == 'points':
+            visible = df.iloc[result]
+            add_stop_layer(
+                m, visible, colors=score_colors(visible['suitability_score']), radius=5,
+                popup_fields=STOP_POPUP_FIELDS, tooltip='stop_name'
+            )
+            st.caption(f"Görünüm alanında {len(visible)} durak gösteriliyor")
+        else:
+            # Düşük yakınlaştırmada hücre başına tek daire: boyut adede göre
+            result['stop_name'] = result['count'].astype(str) + ' durak'
+            add_stop_layer(
+                m, result, colors=score_colors(result['value']),
+                radius=4 + 3 * np.log1p(result['count']),
+                popup_fields=[('Ortalama Uygunluk Skoru', 'value', 1, '')],
+                tooltip='stop_name'
+            )
+            st.caption(f"{int(result['count'].sum())} durak {len(result)} hücrede toplandı; "
+                       "ayrıntı için yakınlaştırın")
+
+        with metrics.timer('map_render', mode='viewport'):
+            streamlit_folium.st_folium(
+                m, width=800, height=600, key='viewport_map',
+                returned_objects=['bounds', 'zoom', 'center']
+            )
+
+with col2:
+    go = lazy_import('plotly.graph_objects')
     # Güneşlenme dağılımı grafiği
     st.subheader("Güneşlenme Dağılımı")
-    fig = px.histogram(
-        filtered_df,
-        x='irradiation_kWh',
-        nbins=20,
-        title='Güneşlenme Dağılımı'
+    # Kutu sınırları tüm veri için sabit; sayımlar önbellekteki görünümden gelir
+    edges = views.bin_edges
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=filter_view['histogram'],
+        width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]),
+        hovertemplate='%{customdata[0]:.0f}–%{customdata[1]:.0f} kWh/yıl: %{y}<extra></extra>'
+    ))
+    fig.update_layout(
+        title='Güneşlenme Dağılımı', bargap=0,
+        xaxis_title='irradiation_kWh', yaxis_title='count'
     )
     st.plotly_chart(fig, use_container_width=True)
     
     # Özellik önemlilikleri grafiği
     st.subheader("Özellik Önemlilikleri")
-    feature_importance = pd.DataFrame({
-        'feature': features,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=True)
-    
-    fig = px.bar(
-        feature_importance,
-        x='importance',
-        y='feature',
-        orientation='h',
-        title='Özellik Önemlilikleri'
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    # Hata veren çağrılar önbelleğe alınmaz: sonraki çalıştırmada yeniden denenir
+    try:
+        st.plotly_chart(feature_importance_figure(), use_container_width=True)
+    except Exception as e:
+        st.error(f"Model yüklenemedi, özellik önemlilikleri gösterilemiyor: {str(e)}")
 
 # Alt bilgi
 st.markdown("---")
-st.markdown("© 2024 EcoHalt Solar - Tüm hakları saklıdır.") 
\ No newline at end of file
+st.markdown("© 2024 EcoHalt Solar - Tüm hakları saklıdır.")
+
+# İlk çalıştırmada başlangıç sürelerini raporla (konsol + metrics)
+timings = startup_timings()
+if 'first_run' not in timings:
+    timings['first_run'] = time.perf_counter() - _script_start
+    # Model iş parçacığı sözlüğe eşzamanlı yazabilir: kopya üzerinden dolaş.
+    # 'model' aşaması yükleme bittiğinde model_prewarm içinde raporlanır
+    for phase, seconds in list(timings.items()):
+        if phase != 'model':
+            metrics.observe('app_startup_seconds', seconds, phase=phase)
+    print("Başlangıç süreleri: " + ", ".join(f"{phase} {seconds * 1000:.0f} ms"
+                                           for phase, seconds in list(timings.items()))) 
\ No newline at end of file
@@ -0,0 +1,169 @@
+# Eğitilmiş uygunluk modeli ile toplu tahmin
+# Aday konumlar (CSV ya da Parquet) sabit boyutlu parçalar halinde okunur,
+# scaler.transform + model.predict_proba ile puanlanır ve çıktı dosyasına
+# parça parça yazılır; bellek kullanımı parça boyutuyla sınırlı kalır.
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import pandas as pd
+
+import metrics
+
+# app.py'deki tahmin eşiği ile aynı
+DEFAULT_THRESHOLD = 0.3
+
+_worker_model = None
+
+
+def load_model(folder_path):
+    """Modeli, scaler'ı ve özellik listesini yükle"""
+    model = joblib.load(os.path.join(folder_path, "solar_stop_model.joblib"))
+    scaler = joblib.load(os.path.join(folder_path, "solar_stop_scaler.joblib"))
+    with open(os.path.join(folder_path, "model_features.txt"), 'r') as f:
+        features = f.read().splitlines()
+    return model, scaler, features
+
+
+def csv_dtypes(input_file, sample_rows, numeric=()):
+    """
+    CSV sütun tiplerini ilk sample_rows satırdan bir kez belirle: sayısal sütunlar
+    float64 (tamsayılar başka parçada NaN içerebilir), diğerleri string.
+    Parça başına tip çıkarımı parçalar arasında farklı şemalar üretirdi.
+    """
+    sample = pd.read_csv(input_file, nrows=sample_rows)
+    dtypes = {}
+    for col in sample.columns:
+        is_numeric = pd.api.types.is_numeric_dtype(sample[col]) and not pd.api.types.is_bool_dtype(sample[col])
+        # Örneklemde tamamen boş sütunun tipi bilinmez: özellik değilse metin sayılır
+        if col in numeric or (is_numeric and sample[col].notna().any()):
+            dtypes[col] = 'float64'
+        else:
+            dtypes[col] = 'string'
+    return dtypes
+
+
+def iter_chunks(input_file, chunksize, numeric=()):
+    """Girdi dosyasını DataFrame parçaları halinde oku (tüm parçalarda aynı tipler)"""
+    if input_file.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(input_file)
+        for batch in parquet_file.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        dtypes = csv_dtypes(input_file, chunksize, numeric)
+        yield from pd.read_csv(input_file, chunksize=chunksize, dtype=dtypes)
+
+
+def score_chunk(chunk, model, scaler, features, threshold=DEFAULT_THRESHOLD):
+    """Bir parçayı puanla; olasılık ve etiket sütunlarını ekle"""
+    X = scaler.transform(chunk[features])
+    with metrics.timer('predict_proba', source='batch'):
+        probability = model.predict_proba(X)[:, 1]
+    metrics.count('predicted_rows_total', len(chunk))
+    chunk = chunk.copy()
+    chunk['probability'] = probability
+    chunk['label'] = (probability > threshold).astype(int)
+    return chunk
+
+
+def _init_worker(folder_path):
+    global _worker_model
+    _worker_model = load_model(folder_path)
+    # Her süreç tek çekirdek kullansın, süreç havuzu paralelliği sağlar
+    _worker_model[0].n_jobs = 1
+
+
+def _score_in_worker(chunk, threshold):
+    model, scaler, features = _worker_model
+    return score_chunk(chunk, model, scaler, features, threshold)
+
+
+class ChunkWriter:
+    """Sonuçları CSV ya da Parquet dosyasına parça parça ekle"""
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.parquet = output_file.endswith('.parquet')
+        self.writer = None
+        self.rows = 0
+
+    def write(self, chunk):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.writer is None:
+                # İlk parçada tamamen boş (null tipli) sütunlar metin olarak sabitlenir
+                schema = pa.schema(
+                    [pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f for f in table.schema],
+                    metadata=table.schema.metadata
+                )
+                self.writer = pq.ParquetWriter(self.output_file, schema)
+            # Dosya şeması ilk parçadan sabittir; sonraki parçalar ona dönüştürülür
+            # (ör. bir parçada NaN içerdiği için float, diğerinde int olan sütunlar)
+            self.writer.write_table(table.cast(self.writer.schema))
+        else:
+            chunk.to_csv(self.output_file, mode='w' if self.rows == 0 else 'a',
+                         header=self.rows == 0, index=False)
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def predict_file(input_file, output_file, folder_path, chunksize=50000, workers=1,
+                 threshold=DEFAULT_THRESHOLD):
+    """Girdi dosyasındaki tüm adayları puanla ve çıktı dosyasına yaz"""
+    start = time.perf_counter()
+    writer = ChunkWriter(output_file)
+    with open(os.path.join(folder_path, "model_features.txt"), 'r') as f:
+        chunks = iter_chunks(input_file, chunksize, numeric=f.read().splitlines())
+
+    if workers <= 1:
+        model, scaler, features = load_model(folder_path)
+        for chunk in chunks:
+            writer.write(score_chunk(chunk, model, scaler, features, threshold))
+            print(f"{writer.rows} aday puanlandı")
+    else:
+        # Aynı anda en fazla 2 * workers parça bellekte tutulur
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(folder_path,)) as executor:
+            pending = []
+            for chunk in chunks:
+                pending.append(executor.submit(_score_in_worker, chunk, threshold))
+                if len(pending) >= 2 * workers:
+                    writer.write(pending.pop(0).result())
+                    print(f"{writer.rows} aday puanlandı")
+            for future in pending:
+                writer.write(future.result())
+                print(f"{writer.rows} aday puanlandı")
+
+    writer.close()
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {writer.rows} aday {elapsed:.1f} sn'de puanlandı "
+          f"({writer.rows / max(elapsed, 1e-9):.0f} aday/sn): {output_file}")
+    return writer.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aday durak konumlarını toplu olarak puanla")
+    parser.add_argument("input_file", help="Aday konumlar (.csv ya da .parquet)")
+    parser.add_argument("output_file", help="Çıktı dosyası (.csv ya da .parquet)")
+    parser.add_argument("--model-dir", default=r"D:\Masaüstü\EcoHalt Solar\GTFS",
+                        help="Model, scaler ve özellik listesinin bulunduğu klasör")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=1, help="Süreç havuzu boyutu")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    predict_file(args.input_file, args.output_file, args.model_dir,
+                 chunksize=args.chunksize, workers=args.workers, threshold=args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+# Uçtan uca performans ölçümü (sentetik GTFS verisiyle)
+# Her ölçek için (varsayılan 1k, 10k, 100k, 1M durak) sentetik stops.txt /
+# stop_times.txt üretilir ve hattın aşamaları sırayla ölçülür: durak okuma,
+# güneşlenme zenginleştirme (yerel sahte PVGIS sunucusu), metro uzaklığı,
+# yolcu yoğunluğu, uygunluk skoru, model eğitimi/tahmini, harita HTML üretimi ve
+# dashboard filtre yolu. Süre, işlem hızı ve tepe bellek (tracemalloc) commit
+# bilgisiyle birlikte JSONL dosyasına eklenir; --compare commitleri karşılaştırır.
+# tracemalloc yalnızca ana süreci izler: süreç havuzu kullanan aşamalarda alt
+# süreçlerin toplam tepe PSS'i ayrıca (child_peak_mb) örneklenir, memory_scope
+# alanı hangi belleğin ölçüldüğünü belirtir.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from gtfs_loader import BERLIN_BBOX, BUS_TRAM_PATTERN
+
+DEFAULT_SCALES = [1000, 10000, 100000, 1000000]
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "results.jsonl")
+
+# Her durağa düşen ortalama kalkış (stop_times satırı) sayısı
+DEPARTURES_PER_STOP = 8
+# Sentetik hatlarda raylı sistem (U-/S-Bahn) oranı
+RAIL_ROUTE_SHARE = 0.1
+
+
+def generate_feed(folder, n_stops, seed=42):
+    """Berlin kutusu içinde rastgele duraklar ve hatlarla küçük bir GTFS besleme üret"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    min_lat, min_lon, max_lat, max_lon = BERLIN_BBOX
+
+    kinds = rng.choice(['Bus', 'Tram', 'U', 'S'], n_stops, p=[0.6, 0.2, 0.1, 0.1])
+    names = pd.Series(kinds).str.cat(pd.Series(np.arange(n_stops)).astype(str), sep=' Halt ')
+    lat = rng.uniform(min_lat, max_lat, n_stops)
+    lon = rng.uniform(min_lon, max_lon, n_stops)
+    # Durakların %20'si başka bir durağın ~30 m yakınında (aktarma noktası peronları)
+    platforms = rng.random(n_stops) < 0.2
+    anchor = rng.integers(0, n_stops, platforms.sum())
+    lat[platforms] = lat[anchor] + rng.normal(0, 0.0003, len(anchor))
+    lon[platforms] = lon[anchor] + rng.normal(0, 0.0004, len(anchor))
+    stops = pd.DataFrame({
+        'stop_id': [f"de:{i}" for i in range(n_stops)],
+        'stop_name': names + ' (Berlin)',
+        'stop_lat': np.round(lat, 6),
+        'stop_lon': np.round(lon, 6),
+        'location_type': 0,
+    })
+    stops.to_csv(os.path.join(folder, 'stops.txt'), index=False)
+
+    n_routes = max(10, n_stops // 50)
+    route_types = np.where(rng.random(n_routes) < RAIL_ROUTE_SHARE, 400, 3)
+    pd.DataFrame({'route_id': [f"r{i}" for i in range(n_routes)], 'route_type': route_types}) \
+        .to_csv(os.path.join(folder, 'routes.txt'), index=False)
+
+    pd.DataFrame({
+        'service_id': ['weekday', 'weekend'],
+        'monday': [1, 0], 'tuesday': [1, 0], 'wednesday': [1, 0], 'thursday': [1, 0],
+        'friday': [1, 0], 'saturday': [0, 1], 'sunday': [0, 1],
+        'start_date': ['20240101', '20240101'], 'end_date': ['20241231', '20241231'],
+    }).to_csv(os.path.join(folder, 'calendar.txt'), index=False)
+
+    n_trips = max(20, n_stops * DEPARTURES_PER_STOP // 20)
+    trips = pd.DataFrame({
+        'route_id': [f"r{i}" for i in rng.integers(0, n_routes, n_trips)],
+        'service_id': rng.choice(['weekday', 'weekend'], n_trips, p=[0.75, 0.25]),
+        'trip_id': [f"t{i}" for i in range(n_trips)],
+    })
+    trips.to_csv(os.path.join(folder, 'trips.txt'), index=False)
+
+    # stop_times parça parça yazılır (1M durakta ~8M satır)
+    n_rows = n_stops * DEPARTURES_PER_STOP
+    path = os.path.join(folder, 'stop_times.txt')
+    chunk = 2000000
+    for start in range(0, n_rows, chunk):
+        size = min(chunk, n_rows - start)
+        pd.DataFrame({
+            'trip_id': np.char.add('t', rng.integers(0, n_trips, size).astype(str)),
+            'stop_id': np.char.add('de:', rng.integers(0, n_stops, size).astype(str)),
+            'stop_sequence': rng.integers(1, 40, size),
+        }).to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return folder
+
+
+def git_commit():
+    """Geçerli commit ve çalışma ağacında değişiklik olup olmadığı"""
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=cwd,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=cwd,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+class ChildMemorySampler:
+    """
+    Canlı alt süreçlerin toplam PSS'ini arka planda örnekler ve tepe değeri tutar.
+    RUSAGE_CHILDREN yerine PSS: fork edilen işçiler ana sürecin sayfalarını
+    paylaşır ve ru_maxrss bu sayfaları her işçide tekrar sayar (ayrıca süreç
+    ömrü boyunca en yüksek değerdir, aşamaya ayrılamaz). PSS paylaşılan sayfaları
+    süreçler arasında böler. Yalnızca Linux'ta (/proc) çalışır; başka
+    platformlarda ölçüm None olur.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.available = os.path.exists('/proc/self/smaps_rollup')
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _children():
+        pids = set()
+        for task in os.listdir('/proc/self/task'):
+            try:
+                with open(f'/proc/self/task/{task}/children') as f:
+                    pids.update(f.read().split())
+            except OSError:
+                pass
+        return pids
+
+    @staticmethod
+    def _pss(pid):
+        try:
+            with open(f'/proc/{pid}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return 0
+
+    def _run(self):
+        while True:
+            pids = self._children()
+            if pids:
+                total = sum(self._pss(pid) for pid in pids)
+                self.peak = max(self.peak or 0, total)
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        if self.available:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Örneklemeyi durdur; tepe PSS (bayt) ya da ölçülemediyse None"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+        return self.peak
+
+
+class Recorder:
+    """Aşama ölçümlerini toplar ve JSONL'e ekler"""
+
+    def __init__(self, results_file, track_memory=True, quiet=True):
+        self.results_file = results_file
+        self.track_memory = track_memory
+        self.quiet = quiet
+        self.commit, self.dirty = git_commit()
+        self.run_id = time.strftime('%Y%m%dT%H%M%S')
+        self.records = []
+
+    @contextlib.contextmanager
+    def stage(self, scale, name, items, subprocesses=False):
+        """
+        Bloğu ölç; items işlem hızı için işlenen öğe sayısıdır.
+        subprocesses=True: aşama süreç havuzu kullanır, alt süreç belleği de kaydedilir.
+        """
+        info = {'items': items}
+        sampler = ChildMemorySampler().start() if subprocesses else None
+        if self.track_memory:
+            tracemalloc.start()
+        sink = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sink) if self.quiet else contextlib.nullcontext():
+                yield info
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.track_memory else None
+            if self.track_memory:
+                tracemalloc.stop()
+            child_peak = sampler.stop() if sampler is not None else None
+        record = {
+            'run_id': self.run_id, 'commit': self.commit, 'dirty': self.dirty,
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'scale': scale, 'stage': name, 'seconds': round(elapsed, 4),
+            'items': info['items'],
+            'throughput': round(info['items'] / elapsed, 1) if elapsed > 0 else None,
+            'peak_mb': round(peak / 2 ** 20, 1) if peak is not None else None,
+            'memory_scope': 'parent+children' if subprocesses else 'parent',
+        }
+        if subprocesses:
+            record['child_peak_mb'] = round(child_peak / 2 ** 20, 1) if child_peak is not None else None
+        record.update(info.get('extra', {}))
+        self.records.append(record)
+        os.makedirs(os.path.dirname(self.results_file), exist_ok=True)
+        with open(self.results_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        memory = f", tepe bellek {record['peak_mb']} MB" if peak is not None else ''
+        if child_peak is not None:
+            memory += f", alt süreçler tepe PSS {record['child_peak_mb']} MB"
+        print(f"  {name:20s} {elapsed:8.2f} sn  {record['throughput'] or 0:>12,.0f} öğe/sn{memory}")
+
+
+def run_scale(n_stops, recorder, workdir, enrich_limit=2000, train_limit=100000, filter_queries=200):
+    """Tek bir ölçek için tüm aşamaları ölç"""
+    from enhanced_analysis import calculate_suitability_score
+    from gtfs_loader import read_stops
+    from metro_distance import compute_metro_distance
+    from passenger_density import passenger_density
+
+    print(f"\n=== {n_stops:,} durak ===")
+    folder = os.path.join(workdir, f"gtfs_{n_stops}")
+    if not os.path.exists(os.path.join(folder, 'stop_times.txt')):
+        with recorder.stage(n_stops, 'generate_feed', n_stops):
+            generate_feed(folder, n_stops)
+
+    with recorder.stage(n_stops, 'load_stops', n_stops) as info:
+        df = read_stops(os.path.join(folder, 'stops.txt'), bbox=BERLIN_BBOX)
+        info['extra'] = {'bus_tram': int(df['stop_name'].str.contains(BUS_TRAM_PATTERN, case=False).sum())}
+
+    # Zenginleştirme ağ gecikmesine bağlıdır; büyük ölçeklerde örneklem kullanılır
+    sample = df.head(enrich_limit)
+    with recorder.stage(n_stops, 'enrich_irradiation', len(sample)) as info:
+        info['extra'] = enrich_sample(sample, workdir, n_stops)
+
+    with recorder.stage(n_stops, 'metro_distance', len(df)):
+        df['metro_distance'] = compute_metro_distance(df, folder)
+
+    with recorder.stage(n_stops, 'passenger_density', n_stops * DEPARTURES_PER_STOP, subprocesses=True):
+        df['passenger_density'], _ = passenger_density(df, folder)
+
+    # Büyük ölçekte PVGIS yerine sahte sunucuyla aynı deterministik fonksiyon
+    from pvgis_mock_server import fake_annual_yield
+    rng = np.random.default_rng(0)
+    df['irradiation_kWh'] = fake_annual_yield(df['stop_lat'], df['stop_lon']) + rng.normal(0, 10, len(df))
+    df['building_density'] = rng.uniform(0, 1, len(df))
+    df['shading_factor'] = rng.uniform(0, 1, len(df))
+
+    with recorder.stage(n_stops, 'suitability_score', len(df)):
+        df = calculate_suitability_score(df)
+
+    model_stages(df, recorder, n_stops, train_limit)
+    map_stage(df, recorder, n_stops)
+    filter_stage(df, recorder, n_stops, filter_queries)
+    return df
+
+
+def enrich_sample(sample, workdir, n_stops):
+    """Sahte PVGIS sunucusuna karşı kontrol noktalı zenginleştirme"""
+    from enrichment_pipeline import enrich_with_checkpoint
+    from pvgis_client import PVGISFetcher
+    from pvgis_mock_server import start_server
+
+    server, url = start_server(latency=0.02)
+    checkpoint = os.path.join(workdir, f"checkpoint_{n_stops}.csv")
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    fetcher = PVGISFetcher(url=url, max_workers=16, rate=500.0, backoff_base=0.05)
+    try:
+        enrich_with_checkpoint(sample, fetcher, checkpoint)
+        return {'api_requests': fetcher.stats['requests'], 'api_errors': fetcher.stats['errors']}
+    finally:
+        fetcher.close()
+        server.shutdown()
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+
+def model_stages(df, recorder, n_stops, train_limit):
+    from compiled_forest import CompiledForest, compile_forest
+    from train_model import train_model
+
+    train_df = df.dropna(subset=['irradiation_kWh', 'passenger_density', 'metro_distance'])
+    train_df = train_df.sample(min(train_limit, len(train_df)), random_state=0)
+    train_df = train_df.assign(label=(train_df['suitability_score'] >= train_df['suitability_score'].quantile(0.8)).astype(int))
+    with recorder.stage(n_stops, 'train_model', len(train_df)):
+        model, scaler, features = train_model(train_df)
+
+    X = df[features].to_numpy(dtype=float)
+    with recorder.stage(n_stops, 'predict_proba', len(X)):
+        model.predict_proba(scaler.transform(df[features]))
+
+    compiled = CompiledForest(compile_forest(model, scaler, features))
+    with recorder.stage(n_stops, 'predict_compiled', len(X)):
+        compiled.predict_proba(X)
+
+    rows = X[:200]
+    with recorder.stage(n_stops, 'predict_single_row', len(rows)):
+        for row in rows:
+            compiled.predict_proba(row)
+
+
+def map_stage(df, recorder, n_stops):
+    import branca.colormap as cm
+    import folium
+    from map_layers import add_stop_layer
+
+    with recorder.stage(n_stops, 'map_html', len(df)) as info:
+        m = folium.Map(location=[52.52, 13.405], zoom_start=12)
+        colormap = cm.LinearColormap(['red', 'yellow', 'green'], vmin=0, vmax=100)
+        add_stop_layer(m, df, df['suitability_score'], colormap, popup_fields=[
+            ('Güneşlenme', 'irradiation_kWh', 1, ' kWh/yıl'),
+            ('Uygunluk Skoru', 'suitability_score', 1, ''),
+        ], tooltip='stop_name')
+        html = m.get_root().render()
+        info['extra'] = {'html_mb': round(len(html.encode('utf-8')) / 2 ** 20, 2)}
+
+
+def filter_stage(df, recorder, n_stops, n_queries):
+    """app.py'deki filtre yolu: indeks kurulumu, filtre sorguları, en iyi 5 ve görünüm alanı"""
+    from dashboard_views import DashboardViews
+    from filter_index import FilterIndex
+    from spatial_tiles import SpatialTileIndex
+    from top_k import TopKIndex
+
+    cols = ['irradiation_kWh', 'suitability_score', 'metro_distance']
+    with recorder.stage(n_stops, 'dashboard_index', len(df)):
+        filter_index = FilterIndex(df, cols, text_col='stop_name')
+        tile_index = SpatialTileIndex(df)
+        top_index = TopKIndex(df, 'suitability_score')
+
+    rng = np.random.default_rng(1)
+    texts = ['', '', 'bus', 'tram halt 1', 'berlin']
+    with recorder.stage(n_stops, 'dashboard_query', n_queries):
+        for i in range(n_queries):
+            low = rng.uniform(0, 60)
+            positions = filter_index.query(texts[i % len(texts)], {
+                'irradiation_kWh': (None, None),
+                'suitability_score': (low, 100),
+                'metro_distance': (None, rng.uniform(500, 5000)),
+            })
+            top_index.query(5, positions=positions)
+            lat, lon = rng.uniform(52.4, 52.6), rng.uniform(13.2, 13.6)
+            tile_index.query((lat, lon, lat + 0.05, lon + 0.08), zoom=14, positions=positions,
+                             values=df['suitability_score'].to_numpy())
+
+    # Streamlit yeniden çalıştırmaları: az sayıda filtre durumu tekrar tekrar gelir
+    views = DashboardViews(df, filter_index, top_index)
+    states = [(texts[i % len(texts)], {'suitability_score': (float(i * 5), 100.0)}) for i in range(10)]
+    with recorder.stage(n_stops, 'dashboard_view_replay', n_queries) as info:
+        for i in range(n_queries):
+            views.view(*states[i % len(states)])
+        info['extra'] = views.cache.stats()
+
+
+def compare(results_file):
+    """Son iki commitin ölçümlerini aşama/ölçek bazında karşılaştır"""
+    results = pd.read_json(results_file, lines=True)
+    commits = results.drop_duplicates('commit', keep='last').sort_values('run_id')['commit'].tolist()
+    if len(commits) < 2:
+        print("Karşılaştırma için en az iki commit gerekli")
+        return None
+    old, new = commits[-2], commits[-1]
+    # Her commit için en son çalıştırma
+    latest = results.sort_values('run_id').groupby(['commit', 'scale', 'stage']).last()['seconds']
+    table = pd.DataFrame({old: latest.xs(old), new: latest.xs(new)}).dropna()
+    table['oran'] = (table[new] / table[old]).round(2)
+    print(table.to_string())
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik GTFS verisiyle uçtan uca performans ölçümü")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--output", default=RESULTS_FILE, help="Sonuçların ekleneceği JSONL dosyası")
+    parser.add_argument("--workdir", default=None, help="Sentetik beslemeler (varsayılan: geçici klasör)")
+    parser.add_argument("--enrich-limit", type=int, default=2000, help="Sahte PVGIS'e gönderilecek en fazla durak")
+    parser.add_argument("--train-limit", type=int, default=100000, help="Eğitimde kullanılacak en fazla satır")
+    parser.add_argument("--no-memory", action="store_true", help="tracemalloc'u kapat (daha düşük ek yük)")
+    parser.add_argument("--verbose", action="store_true", help="Aşamaların kendi çıktılarını göster")
+    parser.add_argument("--compare", action="store_true", help="Yalnızca son iki commiti karşılaştır")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.output)
+        return
+
+    recorder = Recorder(args.output, track_memory=not args.no_memory, quiet=not args.verbose)
+    print(f"Commit: {recorder.commit}{' (değişiklik var)' if recorder.dirty else ''}")
+    with contextlib.ExitStack() as stack:
+        workdir = args.workdir or stack.enter_context(tempfile.TemporaryDirectory())
+        for n_stops in args.scales:
+            run_scale(n_stops, recorder, workdir, args.enrich_limit, args.train_limit)
+    print(f"\nSonuçlar eklendi: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
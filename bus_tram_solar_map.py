@@ -5,6 +5,8 @@ import folium
 import os
 from branca.colormap import linear
 from folium.plugins import Fullscreen
+from map_layers import add_stop_layer
+from storage import load_dataset
 
 # 🔧 Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
@@ -12,7 +14,7 @@ input_file = os.path.join(folder_path, "bus_tram_stops_with_irradiation.csv")
 output_file = os.path.join(folder_path, "bus_tram_solar_map.html")
 
 # 📄 Veriyi oku
-df = pd.read_csv(input_file)
+df = load_dataset(input_file, columns=['stop_name', 'stop_lat', 'stop_lon', 'irradiation_kWh'])
 df = df[pd.notnull(df['irradiation_kWh'])]
 
 # 🗺 Harita başlat
@@ -24,17 +26,11 @@ Fullscreen().add_to(m)
 colormap = linear.YlOrRd_09.scale(df['irradiation_kWh'].min(), df['irradiation_kWh'].max())
 colormap.caption = 'Yıllık Güneşlenme (kWh/yıl)'
 
-# 📍 Noktaları ekle
-for _, row in df.iterrows():
-    folium.CircleMarker(
-        location=[row['stop_lat'], row['stop_lon']],
-        radius=4,
-        color=colormap(row['irradiation_kWh']),
-        fill=True,
-        fill_color=colormap(row['irradiation_kWh']),
-        fill_opacity=0.8,
-        popup=f"{row['stop_name']}<br>Güneşlenme: {row['irradiation_kWh']:.1f} kWh"
-    ).add_to(m)
+# 📍 Noktaları tek katman olarak ekle
+add_stop_layer(
+    m, df, df['irradiation_kWh'], colormap, radius=4, fill_opacity=0.8,
+    popup_fields=[('Güneşlenme', 'irradiation_kWh', 1, ' kWh')]
+)
 
 # 🎚️ Renk skalası ekle
 colormap.add_to(m)
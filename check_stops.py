@@ -1,17 +1,17 @@
-import pandas as pd
 import os
+from gtfs_loader import read_stops, BUS_TRAM_PATTERN
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
 stops_file = os.path.join(folder_path, "stops.txt")
 
-# Durakları oku
-df = pd.read_csv(stops_file)
+# Durakları oku ve otobüs/tramvay duraklarını okuma sırasında filtrele
+bus_tram_stops, total_stops = read_stops(
+    stops_file, name_pattern=BUS_TRAM_PATTERN,
+    columns=['stop_id', 'stop_name', 'stop_lat', 'stop_lon'], return_total=True
+)
 
-# Otobüs ve tramvay duraklarını filtrele
-bus_tram_stops = df[df['stop_name'].str.contains('Bus|Tram|bus|tram', na=False)]
-
-print(f"Toplam durak sayısı: {len(df)}")
+print(f"Toplam durak sayısı: {total_stops}")
 print(f"Otobüs ve tramvay durağı sayısı: {len(bus_tram_stops)}")
 
 # İlk 5 durağı göster
@@ -0,0 +1,113 @@
+# Eğitilmiş RandomForest'ı düz dizilere derleme ve yalnızca NumPy ile tahmin
+# Tüm ağaçların düğümleri tek dizilerde birleştirilir (özellik, eşik, sol, sağ,
+# yaprak olasılığı). Scaler (MinMaxScaler/StandardScaler gibi doğrusal ölçekleyiciler)
+# eşiklere gömülür: ölçeklenmiş x <= t  <=>  ham x <= (t - b) / a.
+# Dosya .npz olarak saklanır; yüklemek ve tahmin etmek için sklearn gerekmez.
+
+import warnings
+
+import numpy as np
+
+
+def compile_forest(model, scaler=None, features=None):
+    """Ağaç topluluğunu düz dizilere çevir; scaler verilirse eşiklere göm"""
+    n_features = model.n_features_in_
+    if scaler is not None:
+        # Özellik başına doğrusal dönüşüm: ölçekli = a * ham + b
+        # Scaler DataFrame ile eğitildiyse sütun adı uyarısı verir; burada önemsiz
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            b = scaler.transform(np.zeros((1, n_features)))[0]
+            a = scaler.transform(np.ones((1, n_features)))[0] - b
+        if np.any(a <= 0):
+            raise ValueError("Scaler eşiklere gömülemiyor: tüm özellik ölçekleri pozitif olmalı")
+    else:
+        a, b = np.ones(n_features), np.zeros(n_features)
+
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        leaf = tree.children_left == -1
+        f = np.where(leaf, 0, tree.feature).astype(np.int32)
+        # Yapraklar kendine döner ve eşik +inf olur: sabit sayıda adım yeterli
+        thr = np.where(leaf, np.inf, (tree.threshold - b[f]) / a[f])
+        node_ids = np.arange(n, dtype=np.int32)
+        lft = np.where(leaf, node_ids, tree.children_left) + offset
+        rgt = np.where(leaf, node_ids, tree.children_right) + offset
+        # Düğüm değerleri sürüme göre sayım ya da oran olabilir: oranlara çevir
+        val = tree.value[:, 0, :]
+        val = val / val.sum(axis=1, keepdims=True)
+
+        feature.append(f)
+        threshold.append(thr)
+        left.append(lft.astype(np.int32))
+        right.append(rgt.astype(np.int32))
+        value.append(val)
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    return {
+        'feature': np.concatenate(feature),
+        'threshold': np.concatenate(threshold),
+        'left': np.concatenate(left),
+        'right': np.concatenate(right),
+        'value': np.concatenate(value),
+        'roots': np.array(roots, dtype=np.int32),
+        'max_depth': np.int32(max_depth),
+        'classes': np.asarray(model.classes_),
+        'feature_importances': np.asarray(model.feature_importances_),
+        'features': np.array(features if features is not None else [], dtype=str),
+    }
+
+
+def save_compiled(compiled, path):
+    np.savez(path, **compiled)
+
+
+class CompiledForest:
+    """Derlenmiş orman için hafif tahminci (sklearn predict_proba karşılığı)"""
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        # children[0] = sol, children[1] = sağ; dal seçimi tek indeksleme ile yapılır
+        self.children = np.stack([arrays['left'], arrays['right']])
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = int(arrays['max_depth'])
+        self.classes_ = arrays['classes']
+        self.feature_importances_ = arrays['feature_importances']
+        self.features = list(arrays['features'])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def predict_proba(self, X):
+        """Ham (ölçeklenmemiş) özelliklerle sınıf olasılıkları"""
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X[None, :]
+        if len(X) == 1:
+            # Tek satır (dashboard): yalnızca ağaçlar boyunca vektörel
+            x = X[0]
+            node = self.roots
+            for _ in range(self.max_depth):
+                go_right = (x[self.feature[node]] > self.threshold[node]).view(np.int8)
+                node = self.children[go_right, node]
+            return self.value[node].mean(axis=0)[None, :]
+
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_right = (X[rows, self.feature[node]] > self.threshold[node]).view(np.int8)
+            node = self.children[go_right, node]
+        return self.value[node].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
@@ -1,76 +1,69 @@
 # Otobüs ve tramvay duraklarını filtrele ve güneşlenme verilerini ekle
 
-import pandas as pd
 import os
-import requests
-import time
+from gtfs_loader import read_stops, BERLIN_BBOX, BUS_TRAM_PATTERN
+from pvgis_client import PVGISFetcher
+from irradiation_cache import IrradiationCache
+from enrichment_pipeline import enrich_with_checkpoint
+from storage import save_dataset
+from clearsky_model import estimate_annual_yield
 
 # Dosya yolları
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
 stops_file = os.path.join(folder_path, "stops.txt")
 output_file = os.path.join(folder_path, "bus_tram_stops_with_irradiation.csv")
+cache_file = os.path.join(folder_path, "pvgis_cache.sqlite")
+checkpoint_file = os.path.join(folder_path, "bus_tram_irradiation_checkpoint.csv")
 
-# Durakları oku
-df = pd.read_csv(stops_file)
+# Aynı ızgara hücresine (metre) düşen duraklar için tek bir PVGIS isteği yapılır
+cluster_size_m = 50
 
-# Otobüs ve tramvay duraklarını filtrele
-bus_tram_stops = df[df['stop_name'].str.contains('Bus|Tram|bus|tram', na=False)].copy()
+# Durakları oku; otobüs/tramvay ve Berlin sınırları filtreleri okuma sırasında uygulanır
+bus_tram_stops = read_stops(stops_file, bbox=BERLIN_BBOX, name_pattern=BUS_TRAM_PATTERN)
 
-# Berlin sınırları (yaklaşık):
-# Enlem: 52.3382 - 52.6755
-# Boylam: 13.0883 - 13.7611
-berlin_mask = (
-    (bus_tram_stops['stop_lat'] >= 52.3382) & (bus_tram_stops['stop_lat'] <= 52.6755) &
-    (bus_tram_stops['stop_lon'] >= 13.0883) & (bus_tram_stops['stop_lon'] <= 13.7611)
-)
-bus_tram_stops = bus_tram_stops[berlin_mask].copy()
-
-def get_solar_irradiation(lat, lon):
-    """PVGIS API'den yıllık toplam güneşlenme verisi al (kWh/m2/yıl)"""
-    url = "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "raddatabase": "PVGIS-SARAH2",
-        "components": 1,
-        "outputformat": "json",
-        "peakpower": 1,  # Zorunlu parametre
-        "loss": 14       # Zorunlu parametre
-    }
-    try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            # Yıllık toplam global irradiation (kWh/m2/yıl)
-            return data['outputs']['totals']['fixed']['E_y']
-        else:
-            print(f"Hata: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        print(f"Hata: {str(e)}")
-        return None
+# PVGIS PVcalc parametreleri
+PVGIS_PARAMS = {
+    "raddatabase": "PVGIS-SARAH2",
+    "components": 1,
+    "outputformat": "json",
+    "peakpower": 1,  # Zorunlu parametre
+    "loss": 14       # Zorunlu parametre
+}
 
 # Güneşlenme verilerini ekle
 print(f"Toplam {len(bus_tram_stops)} otobüs ve tramvay durağı işleniyor...")
-irradiation_data = []
-
-for idx, row in bus_tram_stops.iterrows():
-    print(f"Durak {idx+1}/{len(bus_tram_stops)}: {row['stop_name']}")
-    irradiation = get_solar_irradiation(row['stop_lat'], row['stop_lon'])
-    irradiation_data.append(irradiation)
-    time.sleep(1)  # API rate limit için bekleme
+cache = IrradiationCache(cache_file)
+fetcher = PVGISFetcher(PVGIS_PARAMS, cache=cache)
+bus_tram_stops = enrich_with_checkpoint(
+    bus_tram_stops, fetcher, checkpoint_file, cell_size_m=cluster_size_m
+)
+fetcher.close()
+cache_stats = cache.stats()
+cache.close()
 
-# Güneşlenme verilerini DataFrame'e ekle
-bus_tram_stops['irradiation_kWh'] = irradiation_data
+# PVGIS'ten alınamayan duraklar için yerel açık gökyüzü modeliyle yedek tahmin
+# (PVGIS varsayılanıyla aynı: yatay panel, aynı kayıp oranı)
+missing = bus_tram_stops['irradiation_kWh'].isna()
+valid_irradiation = int((~missing).sum())
+bus_tram_stops['irradiation_source'] = 'pvgis'
+if missing.any():
+    bus_tram_stops.loc[missing, 'irradiation_kWh'] = estimate_annual_yield(
+        bus_tram_stops.loc[missing, 'stop_lat'], bus_tram_stops.loc[missing, 'stop_lon'],
+        tilt=0, loss=PVGIS_PARAMS['loss']
+    )
+    bus_tram_stops.loc[missing, 'irradiation_source'] = 'local_model'
 
-# Sonuçları kaydet
-bus_tram_stops.to_csv(output_file, index=False)
+# Sonuçları kaydet; iş tamamlandığı için kontrol noktası artık gerekmiyor
+save_dataset(bus_tram_stops, output_file)
 print(f"\nVeriler kaydedildi: {output_file}")
+if os.path.exists(checkpoint_file):
+    os.remove(checkpoint_file)
 
 # İstatistikler
 total_stops = len(bus_tram_stops)
-valid_irradiation = bus_tram_stops['irradiation_kWh'].notna().sum()
 print(f"\nİstatistikler:")
 print(f"Toplam durak sayısı: {total_stops}")
 print(f"Güneşlenme verisi alınan durak sayısı: {valid_irradiation}")
+print(f"Yerel modelle tahmin edilen durak sayısı: {int(missing.sum())}")
+print(f"Önbellek isabeti: {cache_stats['hits']} / ıska: {cache_stats['misses']}")
 print(f"Başarı oranı: {(valid_irradiation/total_stops)*100:.1f}%") 
\ No newline at end of file
@@ -0,0 +1,121 @@
+# Dashboard için filtre durumuna göre önbelleklenen türetilmiş görünümler
+# Filtre durumu (arama metni + aralıklar) kanonik bir karmaya çevrilir; aynı
+# filtreyle yapılan yeniden çalıştırmalar eşleşen konumları, ortalamaları, en iyi
+# durakları ve histogramı sınırlı bir LRU önbellekten alır.
+# Histogram kutu sınırları tüm veri üzerinden bir kez belirlenir ve her satırın
+# kutu numarası önceden hesaplanır; herhangi bir filtre altındaki histogram
+# yalnızca bu numaraların sayımıdır (yeniden kutulama yapılmaz).
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import metrics
+
+
+def filter_key(text='', ranges=None):
+    """Filtre durumunun kanonik karması (sıra ve büyük/küçük harf duyarsız)"""
+    ranges = ranges or {}
+    state = {
+        'text': (text or '').lower(),
+        'ranges': sorted(
+            (col, None if low is None else float(low), None if high is None else float(high))
+            for col, (low, high) in ranges.items()
+        ),
+    }
+    return hashlib.sha1(json.dumps(state).encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """En son kullanılan maxsize kaydı tutan, iş parçacığı güvenli önbellek"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+class DashboardViews:
+    """FilterIndex + TopKIndex üzerinde önbellekli dashboard görünümleri"""
+
+    def __init__(self, df, filter_index, top_index, hist_col='irradiation_kWh', bins=20,
+                 mean_cols=('irradiation_kWh', 'suitability_score'), top_n=5, cache_size=64):
+        self.filter_index = filter_index
+        self.top_index = top_index
+        self.top_n = top_n
+        self.bins = bins
+        self.cache = LRUCache(cache_size)
+        self.mean_values = {col: df[col].to_numpy(dtype=float) for col in mean_cols}
+
+        # Sabit kutu sınırları; NaN değerler sayılmayan ek kutuya (bins) düşer
+        values = df[hist_col].to_numpy(dtype=float)
+        finite = values[np.isfinite(values)]
+        low, high = (finite.min(), finite.max()) if len(finite) else (0.0, 1.0)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        self.bin_edges = np.linspace(low, high, bins + 1)
+        bin_ids = np.searchsorted(self.bin_edges, values, side='right') - 1
+        bin_ids = np.clip(bin_ids, 0, bins - 1)
+        self.bin_ids = np.where(np.isfinite(values), bin_ids, bins).astype(np.int32)
+
+    def histogram(self, positions):
+        """Konumların kutu başına sayıları (sınırlar: self.bin_edges)"""
+        return np.bincount(self.bin_ids[positions], minlength=self.bins + 1)[:self.bins]
+
+    def _compute(self, text, ranges):
+        positions = self.filter_index.query(text, ranges)
+        means = {}
+        for col, values in self.mean_values.items():
+            selected = values[positions]
+            selected = selected[~np.isnan(selected)]
+            means[col] = selected.mean() if len(selected) else np.nan
+        return {
+            'positions': positions,
+            'count': len(positions),
+            'means': means,
+            'top': self.top_index.query(self.top_n, positions=positions),
+            'histogram': self.histogram(positions),
+        }
+
+    def view(self, text='', ranges=None):
+        """
+        Filtre durumu için görünüm: positions, count, means, top, histogram.
+        Dönen diziler önbellekle paylaşılır; değiştirilmemelidir.
+        """
+        key = filter_key(text, ranges)
+        result = self.cache.get(key)
+        if result is None:
+            metrics.count('dashboard_view_cache_misses_total')
+            with metrics.timer('dashboard_view'):
+                result = self._compute(text, ranges)
+            self.cache.put(key, result)
+        else:
+            metrics.count('dashboard_view_cache_hits_total')
+        return result
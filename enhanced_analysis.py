@@ -1,49 +1,66 @@
 import pandas as pd
 import numpy as np
+import os
 from sklearn.preprocessing import MinMaxScaler
 import folium
 from folium.plugins import MarkerCluster
 import branca.colormap as cm
+import metrics
+from map_layers import add_stop_layer
+from storage import load_dataset, save_dataset
+from metro_distance import compute_metro_distance
+from passenger_density import passenger_density
+from urban_features import building_density, shading_factor
+from incremental_score import IncrementalScorer, SCORE_FEATURES, SCORE_WEIGHTS
+from top_k import top_k, DEFAULT_MIN_SEPARATION_M
+
+# Yerel bina taban alanları ve yüzey modeli (DSM) dosyaları
+BUILDINGS_FILE = "GTFS/buildings.gpkg"
+DSM_FILE = "GTFS/dsm.tif"
+# Artımlı skor durumu (günlük güncellemelerde tam yeniden hesaplamayı önler)
+SCORE_STATE_FILE = "GTFS/suitability_state.joblib"
 
 def load_and_prepare_data():
     """Verileri yükle ve hazırla"""
     # Ana veri setini yükle
-    df = pd.read_csv("GTFS/bus_tram_stops_with_irradiation.csv")
+    df = load_dataset("GTFS/bus_tram_stops_with_irradiation.csv")
     
-    # Metro istasyonlarına olan uzaklık (örnek veri - gerçek veri ile değiştirilmeli)
-    df['metro_distance'] = np.random.uniform(0, 2000, len(df))  # metre cinsinden
+    # En yakın U-/S-Bahn istasyonuna uzaklık (GTFS'ten, metre cinsinden)
+    df['metro_distance'] = compute_metro_distance(df, "GTFS")
     
-    # Yolcu yoğunluğu (örnek veri - gerçek veri ile değiştirilmeli)
-    df['passenger_density'] = np.random.uniform(0, 100, len(df))
+    # Yolcu yoğunluğu: GTFS sefer sıklığından türetilen 0-100 göstergesi
+    df['passenger_density'], df['daily_departures'] = passenger_density(df, "GTFS")
     
-    # Bina yoğunluğu (örnek veri - gerçek veri ile değiştirilmeli)
-    df['building_density'] = np.random.uniform(0, 1, len(df))
+    # Bina yoğunluğu: 100 m içindeki bina taban alanı oranı
+    if os.path.exists(BUILDINGS_FILE):
+        df['building_density'] = building_density(df, BUILDINGS_FILE)
+    else:
+        print(f"Uyarı: {BUILDINGS_FILE} bulunamadı, örnek bina yoğunluğu kullanılıyor")
+        df['building_density'] = np.random.uniform(0, 1, len(df))
     
-    # Gölgelenme faktörü (örnek veri - gerçek veri ile değiştirilmeli)
-    df['shading_factor'] = np.random.uniform(0, 1, len(df))
+    # Gölgelenme faktörü: DSM'den 1 - gökyüzü görüş faktörü
+    if os.path.exists(DSM_FILE):
+        df['shading_factor'] = shading_factor(df, DSM_FILE)
+    else:
+        print(f"Uyarı: {DSM_FILE} bulunamadı, örnek gölgelenme faktörü kullanılıyor")
+        df['shading_factor'] = np.random.uniform(0, 1, len(df))
     
     return df
 
+@metrics.timed()
 def calculate_suitability_score(df):
     """Uygunluk skoru hesapla"""
     # Özellikleri normalize et
     scaler = MinMaxScaler()
-    features = ['irradiation_kWh', 'metro_distance', 'passenger_density', 
-                'building_density', 'shading_factor']
+    features = SCORE_FEATURES
     
     normalized_features = pd.DataFrame(
         scaler.fit_transform(df[features]),
         columns=features
     )
     
-    # Ağırlıklar (bu değerler ayarlanabilir)
-    weights = {
-        'irradiation_kWh': 0.4,        # Güneşlenme potansiyeli
-        'metro_distance': -0.2,        # Metroya yakınlık (negatif çünkü uzaklık)
-        'passenger_density': 0.2,      # Yolcu yoğunluğu
-        'building_density': -0.1,      # Bina yoğunluğu (negatif çünkü gölgelenme)
-        'shading_factor': -0.1         # Gölgelenme faktörü (negatif çünkü gölge)
-    }
+    # Ağırlıklar (incremental_score.SCORE_WEIGHTS içinde ayarlanabilir)
+    weights = SCORE_WEIGHTS
     
     # Uygunluk skorunu hesapla
     df['suitability_score'] = sum(
@@ -59,13 +76,30 @@ def calculate_suitability_score(df):
     
     return df
 
-def get_top_recommendations(df, n=10):
-    """En uygun n durağı öner"""
-    return df.nlargest(n, 'suitability_score')[
+def update_suitability_score(df, state_file=SCORE_STATE_FILE):
+    """
+    Kayıtlı durum varsa yalnızca değişen durakları yeniden skorla,
+    yoksa tam hesaplama yapıp durumu oluştur. Sırası değişen durakları da döndürür.
+    """
+    if not os.path.exists(state_file):
+        df = calculate_suitability_score(df)
+        IncrementalScorer().fit(df).save(state_file)
+        return df, None
+    
+    scorer = IncrementalScorer.load(state_file)
+    rank_changes = scorer.update(df, remove_missing=True)
+    df['suitability_score'] = df['stop_id'].astype(str).map(scorer.scores()).to_numpy()
+    scorer.save(state_file)
+    return df, rank_changes
+
+def get_top_recommendations(df, n=10, min_separation_m=DEFAULT_MIN_SEPARATION_M):
+    """En uygun n durağı öner (birbirinden en az min_separation_m uzak, farklı yerler)"""
+    return df.iloc[top_k(df, n, 'suitability_score', min_separation_m)][
         ['stop_name', 'stop_lat', 'stop_lon', 'irradiation_kWh', 
          'metro_distance', 'passenger_density', 'suitability_score']
     ]
 
+@metrics.timed()
 def create_enhanced_map(df, top_recommendations):
     """Gelişmiş harita oluştur"""
     # Berlin merkezi
@@ -87,30 +121,17 @@ def create_enhanced_map(df, top_recommendations):
     # Marker cluster
     marker_cluster = MarkerCluster().add_to(m)
     
-    # Tüm durakları ekle
-    for idx, row in df.iterrows():
-        # Popup içeriği
-        popup_content = f"""
-        <div style='font-family: Arial; width: 200px;'>
-            <h4 style='margin-bottom: 5px;'>{row['stop_name']}</h4>
-            <p style='margin: 2px 0;'>Güneşlenme: {row['irradiation_kWh']:.1f} kWh/yıl</p>
-            <p style='margin: 2px 0;'>Metro Uzaklığı: {row['metro_distance']:.0f} m</p>
-            <p style='margin: 2px 0;'>Yolcu Yoğunluğu: {row['passenger_density']:.1f}</p>
-            <p style='margin: 2px 0;'>Uygunluk Skoru: {row['suitability_score']:.1f}</p>
-        </div>
-        """
-        
-        # Marker ekle
-        folium.CircleMarker(
-            location=[row['stop_lat'], row['stop_lon']],
-            radius=5,
-            popup=folium.Popup(popup_content, max_width=300),
-            color=colormap(row['suitability_score']),
-            fill=True,
-            fill_color=colormap(row['suitability_score']),
-            fill_opacity=0.7,
-            tooltip=row['stop_name']
-        ).add_to(marker_cluster)
+    # Tüm durakları tek katman olarak ekle
+    add_stop_layer(
+        marker_cluster, df, df['suitability_score'], colormap, radius=5,
+        popup_fields=[
+            ('Güneşlenme', 'irradiation_kWh', 1, ' kWh/yıl'),
+            ('Metro Uzaklığı', 'metro_distance', 0, ' m'),
+            ('Yolcu Yoğunluğu', 'passenger_density', 1, ''),
+            ('Uygunluk Skoru', 'suitability_score', 1, ''),
+        ],
+        tooltip='stop_name'
+    )
     
     # En iyi önerileri özel işaretleyici ile göster
     for idx, row in top_recommendations.iterrows():
@@ -128,8 +149,15 @@ def main():
     # Verileri yükle ve hazırla
     df = load_and_prepare_data()
     
-    # Uygunluk skorunu hesapla
-    df = calculate_suitability_score(df)
+    # Uygunluk skorunu hesapla (önceki çalıştırmanın durumu varsa artımlı)
+    df, rank_changes = update_suitability_score(df)
+    if rank_changes is None:
+        # İlk çalıştırma: önceki sıra yok; pipeline çıktısı olduğu için boş tablo yazılır
+        rank_changes = pd.DataFrame(columns=['old_rank', 'new_rank', 'old_score', 'new_score'],
+                                    dtype=float).rename_axis('stop_id')
+    else:
+        print(f"Artımlı güncelleme: {len(rank_changes)} durağın sırası değişti")
+    save_dataset(rank_changes.reset_index(), "GTFS/rank_changes.csv")
     
     # En iyi önerileri al
     top_recommendations = get_top_recommendations(df)
@@ -138,8 +166,8 @@ def main():
     create_enhanced_map(df, top_recommendations)
     
     # Sonuçları kaydet
-    df.to_csv("GTFS/enhanced_solar_analysis.csv", index=False)
-    top_recommendations.to_csv("GTFS/top_recommendations.csv", index=False)
+    save_dataset(df, "GTFS/enhanced_solar_analysis.csv")
+    save_dataset(top_recommendations, "GTFS/top_recommendations.csv")
     
     print("\nAnaliz tamamlandı!")
     print(f"Toplam durak sayısı: {len(df)}")
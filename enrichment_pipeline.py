@@ -0,0 +1,71 @@
+# Kontrol noktalı (checkpoint) güneşlenme zenginleştirme hattı
+# Tamamlanan satırlar parça parça diske yazılır; yeniden başlatıldığında
+# işlenmiş duraklar atlanır ve kalan yerden devam edilir.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from stop_clustering import cluster_stops
+
+
+def load_checkpoint(checkpoint_file, key_col='stop_id', value_col='irradiation_kWh'):
+    """Kontrol noktası dosyasındaki başarılı satırları oku"""
+    if not os.path.exists(checkpoint_file):
+        return pd.DataFrame()
+    done = pd.read_csv(checkpoint_file, dtype={key_col: str}, on_bad_lines='skip')
+    # Yarım yazılmış son satır ya da başarısız istekler tekrar denenir
+    done = done[done[value_col].notna()]
+    return done.drop_duplicates(subset=key_col, keep='last')
+
+
+def append_checkpoint(rows, checkpoint_file):
+    """Satırları kontrol noktası dosyasının sonuna ekle"""
+    write_header = not os.path.exists(checkpoint_file) or os.path.getsize(checkpoint_file) == 0
+    with open(checkpoint_file, 'a', encoding='utf-8', newline='') as f:
+        rows.to_csv(f, header=write_header, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def enrich_with_checkpoint(stops, fetcher, checkpoint_file, batch_size=200, cell_size_m=50,
+                           key_col='stop_id', value_col='irradiation_kWh'):
+    """
+    Durakları kümeler halinde işle ve her batch_size kümede bir diske yaz.
+    Tüm durakların güneşlenme değerlerini içeren DataFrame döndürür.
+    """
+    stops = stops.copy()
+    stops[key_col] = stops[key_col].astype(str)
+
+    done = load_checkpoint(checkpoint_file, key_col, value_col)
+    done_ids = set(done[key_col]) if not done.empty else set()
+    remaining = stops[~stops[key_col].isin(done_ids)]
+    print(f"Kontrol noktası: {len(done_ids)} durak daha önce işlenmiş, {len(remaining)} durak kaldı")
+
+    if not remaining.empty:
+        cluster_ids, representatives = cluster_stops(remaining, cell_size_m)
+        located = int((cluster_ids >= 0).sum())
+        saved = located - len(representatives)
+        print(f"{located} durak {len(representatives)} kümeye indirildi "
+              f"({saved} API çağrısı tasarruf edildi)")
+        if located < len(remaining):
+            print(f"Koordinatı eksik {len(remaining) - located} durak atlandı (değer NaN kalır)")
+
+        for start in range(0, len(representatives), batch_size):
+            batch = representatives.iloc[start:start + batch_size]
+            values = fetcher.fetch_many(zip(batch['stop_lat'], batch['stop_lon']), verbose=False)
+            by_cluster = pd.Series(values, index=batch.index, dtype=float)
+
+            in_batch = np.isin(cluster_ids, batch.index.to_numpy())
+            rows = remaining[in_batch].copy()
+            rows[value_col] = by_cluster.reindex(cluster_ids[in_batch]).to_numpy()
+            append_checkpoint(rows, checkpoint_file)
+
+            processed = min(start + batch_size, len(representatives))
+            print(f"{processed}/{len(representatives)} küme işlendi ve kaydedildi")
+
+    done = load_checkpoint(checkpoint_file, key_col, value_col)
+    values = done.set_index(key_col)[value_col]
+    stops[value_col] = stops[key_col].map(values)
+    return stops
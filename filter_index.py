@@ -0,0 +1,97 @@
+# Dashboard filtreleri için önceden hesaplanmış indeks
+# Aralık filtreleri sıralı diziler üzerinde ikili arama ile,
+# durak adı araması n-gram indeksi ile yanıtlanır.
+
+from collections import defaultdict
+
+import numpy as np
+
+
+class FilterIndex:
+    """Bir kez kurulan, her widget etkileşiminde sorgulanan filtre indeksi"""
+
+    def __init__(self, df, range_cols, text_col='stop_name', ngram=3):
+        self.size = len(df)
+        self.ngram = ngram
+
+        # Aralık sütunları: değerler ve sıralama permütasyonu
+        self.values = {}
+        self.order = {}
+        self.sorted_values = {}
+        for col in range_cols:
+            values = df[col].to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')
+            self.values[col] = values
+            self.order[col] = order
+            self.sorted_values[col] = values[order]
+
+        # Metin sütunu: 1..ngram uzunluğundaki tüm parçalar için konum listeleri
+        names = df[text_col]
+        self.has_name = names.notna().to_numpy()
+        self.names = names.fillna('').astype(str).str.lower().to_numpy()
+        postings = defaultdict(list)
+        for pos, name in enumerate(self.names):
+            grams = set()
+            for n in range(1, ngram + 1):
+                grams.update(name[i:i + n] for i in range(len(name) - n + 1))
+            for gram in grams:
+                postings[gram].append(pos)
+        self.postings = {gram: np.array(p, dtype=np.int64) for gram, p in postings.items()}
+
+    def _range_bounds(self, col, low, high):
+        sorted_values = self.sorted_values[col]
+        start = np.searchsorted(sorted_values, low, side='left') if low is not None else 0
+        end = np.searchsorted(sorted_values, high, side='right') if high is not None else len(sorted_values)
+        return start, end
+
+    def _text_candidates(self, text):
+        """Metni içeren satırların konumları"""
+        text = text.lower()
+        if not text:
+            return np.flatnonzero(self.has_name)
+        if len(text) <= self.ngram:
+            return self.postings.get(text, np.empty(0, dtype=np.int64))
+
+        grams = {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+        lists = sorted((self.postings.get(g, np.empty(0, dtype=np.int64)) for g in grams), key=len)
+        candidates = lists[0]
+        for other in lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = candidates[np.isin(candidates, other, assume_unique=True)]
+        # n-gram kesişimi yanlış pozitif verebilir; gerçek alt dize kontrolü
+        return np.array([p for p in candidates if text in self.names[p]], dtype=np.int64)
+
+    def query(self, text='', ranges=None):
+        """
+        Filtrelere uyan satır konumlarını (artan sırada) döndür.
+        ranges: {sütun: (alt, üst)}; sınır None ise o taraf açıktır.
+        """
+        ranges = ranges or {}
+
+        # En seçici aralık filtresiyle başla, diğerlerini yalnızca adaylar üzerinde uygula
+        bounds = {col: self._range_bounds(col, low, high) for col, (low, high) in ranges.items()}
+        text_candidates = self._text_candidates(text) if text else None
+        if bounds:
+            best = min(bounds, key=lambda c: bounds[c][1] - bounds[c][0])
+            start, end = bounds[best]
+            if text_candidates is not None and len(text_candidates) < end - start:
+                candidates = text_candidates
+            else:
+                candidates = self.order[best][start:end]
+                if text_candidates is not None:
+                    candidates = np.intersect1d(candidates, text_candidates)
+        else:
+            candidates = self._text_candidates(text)
+
+        if not text:
+            candidates = candidates[self.has_name[candidates]]
+        for col, (low, high) in ranges.items():
+            values = self.values[col][candidates]
+            keep = np.ones(len(candidates), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            candidates = candidates[keep]
+        return np.sort(candidates)
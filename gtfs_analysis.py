@@ -4,12 +4,15 @@ import os
 import webbrowser
 import numpy as np
 from branca.colormap import linear
+from map_layers import add_stop_layer
+from gtfs_loader import read_stops
+from storage import load_dataset
 
 # GTFS stops.txt dosyasını oku
 def read_stops_file(file_path):
     try:
-        # CSV dosyasını oku (GTFS stops.txt bir CSV dosyasıdır)
-        stops_df = pd.read_csv(file_path)
+        # CSV dosyasını açık sütun tipleriyle parça parça oku (GTFS stops.txt bir CSV dosyasıdır)
+        stops_df = read_stops(file_path)
         print(f"Toplam {len(stops_df)} durak noktası okundu.")
         print("\nİlk 5 durak:")
         print(stops_df.head())
@@ -26,17 +29,8 @@ def create_stops_map(df, output_path, title="Berlin Durakları"):
     map_center = [52.5200, 13.4050]
     map_berlin = folium.Map(location=map_center, zoom_start=12, tiles='OpenStreetMap')
     
-    # Tüm durakları haritaya ekle
-    for _, row in df.iterrows():
-        if pd.notnull(row['stop_lat']) and pd.notnull(row['stop_lon']):
-            folium.CircleMarker(
-                location=[row['stop_lat'], row['stop_lon']],
-                radius=2,
-                color='blue',
-                fill=True,
-                fill_opacity=0.6,
-                popup=row['stop_name']  # Durak adını popup olarak göster
-            ).add_to(map_berlin)
+    # Tüm durakları tek katman olarak haritaya ekle (popup: durak adı)
+    add_stop_layer(map_berlin, df, colors='blue', radius=2, fill_opacity=0.6)
     
     # Haritayı kaydet
     map_berlin.save(output_path)
@@ -56,19 +50,12 @@ def create_colored_solar_map(df, output_path, value_col='irradiation_kWh', lat_c
     colormap = linear.YlOrRd_09.scale(min_val, max_val)
     colormap.caption = 'Yıllık Güneşlenme (kWh/yıl)'
 
-    # Durakları haritaya ekle
-    for _, row in df.iterrows():
-        val = row[value_col]
-        if pd.notnull(row[lat_col]) and pd.notnull(row[lon_col]) and pd.notnull(val):
-            folium.CircleMarker(
-                location=[row[lat_col], row[lon_col]],
-                radius=3,
-                color=colormap(val),
-                fill=True,
-                fill_color=colormap(val),
-                fill_opacity=0.7,
-                popup=f"{row[name_col]}<br>{value_col}: {val:.1f} kWh"
-            ).add_to(map_berlin)
+    # Durakları haritaya ekle (renkler vektörel olarak hesaplanır)
+    df = df[pd.notnull(df[value_col])]
+    add_stop_layer(
+        map_berlin, df, df[value_col], colormap, radius=3, title_col=name_col,
+        popup_fields=[(value_col, value_col, 1, ' kWh')], lat_col=lat_col, lon_col=lon_col
+    )
 
     # Renk skalasını haritaya ekle
     colormap.add_to(map_berlin)
@@ -118,7 +105,7 @@ if __name__ == "__main__":
     if not os.path.exists(input_file):
         print(f"Dosya bulunamadı: {input_file}")
     else:
-        df = pd.read_csv(input_file)
+        df = load_dataset(input_file)
         # Sadece irradiation_kWh değeri olanları filtrele
         df = df[pd.notnull(df['irradiation_kWh'])]
         df['irradiation_kWh'] = pd.to_numeric(df['irradiation_kWh'], errors='coerce')
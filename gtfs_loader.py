@@ -0,0 +1,66 @@
+# GTFS stops.txt için ortak, parça parça okuyan yükleyici
+# Sütun tipleri açıkça verilir (tip çıkarımı yapılmaz); kutu ve tür
+# filtreleri her parça okunurken uygulanır, böylece yalnızca eşleşen
+# satırlar bellekte tutulur.
+
+import pandas as pd
+
+import metrics
+
+# GTFS referansındaki stops.txt sütunları ve tipleri
+STOPS_DTYPES = {
+    'stop_id': 'string',
+    'stop_code': 'string',
+    'stop_name': 'string',
+    'stop_desc': 'string',
+    'stop_lat': 'float64',
+    'stop_lon': 'float64',
+    'zone_id': 'string',
+    'stop_url': 'string',
+    'location_type': 'Int8',
+    'parent_station': 'string',
+    'stop_timezone': 'string',
+    'wheelchair_boarding': 'Int8',
+    'level_id': 'string',
+    'platform_code': 'string',
+}
+
+# Berlin sınırları (yaklaşık): (min enlem, min boylam, maks enlem, maks boylam)
+BERLIN_BBOX = (52.3382, 13.0883, 52.6755, 13.7611)
+
+# Otobüs ve tramvay durakları: "Bus"/"Tram" ayrı bir kelime olarak geçmeli
+# ("Buschkrugallee" gibi adlar eşleşmez)
+BUS_TRAM_PATTERN = r'\b(?:bus|tram)\b'
+
+
+@metrics.timed()
+def read_stops(path, bbox=None, name_pattern=None, columns=None, chunksize=200000,
+               return_total=False):
+    """
+    stops.txt dosyasını parça parça oku ve filtreleri okuma sırasında uygula.
+    bbox: (min_lat, min_lon, max_lat, max_lon); name_pattern: büyük/küçük harf
+    duyarsız düzenli ifade. return_total=True ise (df, toplam satır) döner.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [c for c in header if columns is None or c in columns
+               or c in ('stop_name', 'stop_lat', 'stop_lon')]
+    dtype = {c: STOPS_DTYPES.get(c, 'string') for c in usecols}
+
+    parts = []
+    total = 0
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        total += len(chunk)
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            chunk = chunk[
+                chunk['stop_lat'].between(min_lat, max_lat) &
+                chunk['stop_lon'].between(min_lon, max_lon)
+            ]
+        if name_pattern is not None:
+            chunk = chunk[chunk['stop_name'].str.contains(name_pattern, case=False, na=False)]
+        parts.append(chunk)
+
+    stops = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=usecols)
+    if columns is not None:
+        stops = stops[[c for c in columns if c in stops.columns]]
+    return (stops, total) if return_total else stops
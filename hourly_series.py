@@ -0,0 +1,221 @@
+# Durak başına saatlik (8760 saat) üretim serileri
+# Seriler yerel açık gökyüzü modelinden ya da PVGIS seriescalc'tan alınır ve
+# diskte float32 bellek eşlemli (memmap) bir dizide saklanır: satır = durak, sütun = saat.
+# Toplamalar (aylık, en kötü hafta, özerklik) durak parçaları üzerinde vektörel yapılır,
+# böylece tüm şehrin serileri aynı anda belleğe alınmaz.
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from clearsky_model import hourly_times, irradiance_components, plane_of_array
+
+HOURS = 8760
+DAYS = HOURS // 24
+
+# PVGIS seriescalc parametreleri (artık yıl olmayan tek bir yıl)
+SERIES_PARAMS = {
+    "raddatabase": "PVGIS-SARAH2",
+    "pvcalculation": 1,
+    "peakpower": 1,
+    "loss": 14,
+    "angle": 0,
+    "startyear": 2019,
+    "endyear": 2019,
+    "outputformat": "json",
+}
+
+
+def hourly_power(data):
+    """seriescalc yanıtından saatlik üretim (kWh), 8760 değer"""
+    power = np.array([row["P"] for row in data["outputs"]["hourly"]], dtype=np.float32) / 1000
+    if len(power) == HOURS + 24:
+        # Artık yıl: 29 Şubat çıkarılır
+        power = np.delete(power, np.s_[59 * 24:60 * 24])
+    return power[:HOURS]
+
+
+class HourlySeriesStore:
+    """Bellek eşlemli saatlik seri deposu (<path>.f32 + <path>.json)"""
+
+    def __init__(self, path, mode='r'):
+        self.path = path
+        with open(path + '.json', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.stop_ids = pd.Index(self.meta['stop_ids'])
+        self.series = np.memmap(path + '.f32', dtype=np.float32, mode=mode,
+                                shape=(len(self.stop_ids), HOURS))
+
+    @classmethod
+    def create(cls, path, stop_ids, **meta):
+        """Boş (NaN) bir depo oluştur"""
+        stop_ids = [str(s) for s in stop_ids]
+        with open(path + '.json', 'w', encoding='utf-8') as f:
+            json.dump(dict(meta, stop_ids=stop_ids), f)
+        series = np.memmap(path + '.f32', dtype=np.float32, mode='w+', shape=(len(stop_ids), HOURS))
+        series[:] = np.nan
+        series.flush()
+        del series
+        return cls(path, mode='r+')
+
+    def __len__(self):
+        return len(self.stop_ids)
+
+    def iter_chunks(self, chunk_size=1024):
+        """(başlangıç, parça) çiftleri; parça belleğe yalnızca o an okunur"""
+        for start in range(0, len(self), chunk_size):
+            yield start, np.asarray(self.series[start:start + chunk_size], dtype=np.float64)
+
+    def get(self, stop_id):
+        return np.asarray(self.series[self.stop_ids.get_loc(str(stop_id))])
+
+    def flush(self):
+        self.series.flush()
+
+
+def build_local(df, path, tilt=0.0, azimuth=180.0, loss=14.0, peakpower=1.0, chunk_size=256,
+                key_col='stop_id', lat_col='stop_lat', lon_col='stop_lon'):
+    """Yerel modelle tüm duraklar için saatlik seriyi parça parça hesaplayıp depoya yaz"""
+    store = HourlySeriesStore.create(path, df[key_col], source='local_model', tilt=tilt,
+                                     azimuth=azimuth, loss=loss, peakpower=peakpower)
+    lat = df[lat_col].to_numpy(dtype=float)
+    lon = df[lon_col].to_numpy(dtype=float)
+    valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    times = hourly_times()
+    for start in range(0, len(valid), chunk_size):
+        idx = valid[start:start + chunk_size]
+        components = irradiance_components(lat[idx], lon[idx], times)
+        poa = plane_of_array(components, tilt, azimuth)
+        store.series[idx] = poa / 1000 * peakpower * (1 - loss / 100)
+    store.flush()
+    return store
+
+
+def build_pvgis(df, path, fetcher, chunk_size=200, key_col='stop_id',
+                lat_col='stop_lat', lon_col='stop_lon'):
+    """
+    PVGIS seriescalc ile saatlik seriler. fetcher, PVGIS_SERIES_URL ve
+    extract=hourly_power ile kurulmuş bir PVGISFetcher olmalıdır (önbelleksiz).
+    Yanıtlar parça parça depoya yazılır; alınamayan duraklar NaN kalır.
+    """
+    store = HourlySeriesStore.create(path, df[key_col], source='pvgis', **fetcher.params)
+    coords = list(zip(df[lat_col], df[lon_col]))
+    for start in range(0, len(coords), chunk_size):
+        results = fetcher.fetch_many(coords[start:start + chunk_size], verbose=False)
+        for offset, series in enumerate(results):
+            if series is not None:
+                store.series[start + offset] = series
+        store.flush()
+        print(f"{min(start + chunk_size, len(coords))}/{len(coords)} durak işlendi")
+    return store
+
+
+def _month_starts():
+    months = hourly_times().month.to_numpy()
+    return np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+
+
+def monthly_totals(store, chunk_size=1024):
+    """Durak başına aylık üretim (kWh), 12 sütun"""
+    starts = _month_starts()
+    out = np.empty((len(store), 12))
+    for start, chunk in store.iter_chunks(chunk_size):
+        out[start:start + len(chunk)] = np.add.reduceat(chunk, starts, axis=1)
+    return pd.DataFrame(out, index=store.stop_ids, columns=range(1, 13))
+
+
+def daily_totals(chunk):
+    """(durak, 8760) saatlik parçadan (durak, 365) günlük toplamlar"""
+    return chunk.reshape(len(chunk), DAYS, 24).sum(axis=2)
+
+
+def worst_week(store, chunk_size=1024):
+    """Durak başına en düşük üretimli 7 günlük dönem: toplam kWh ve başlangıç günü"""
+    energy = np.empty(len(store))
+    first_day = np.empty(len(store), dtype=int)
+    for start, chunk in store.iter_chunks(chunk_size):
+        daily = daily_totals(chunk)
+        csum = np.concatenate([np.zeros((len(daily), 1)), np.cumsum(daily, axis=1)], axis=1)
+        weekly = csum[:, 7:] - csum[:, :-7]
+        best = np.argmin(weekly, axis=1)
+        energy[start:start + len(chunk)] = weekly[np.arange(len(weekly)), best]
+        first_day[start:start + len(chunk)] = best
+    dates = hourly_times()[::24][first_day].date
+    dates[np.isnan(energy)] = None
+    return pd.DataFrame({'worst_week_kWh': energy, 'worst_week_start': dates}, index=store.stop_ids)
+
+
+def autonomy(store, daily_load_kWh, chunk_size=1024):
+    """
+    Sabit günlük tüketim (ör. e-ink ekran + aydınlatma) için:
+    - deficit_days: üretimin tüketimi karşılamadığı gün sayısı
+    - autonomy_days: art arda en uzun açık gün dizisi (bataryanın dayanması gereken süre)
+    - battery_kWh: hiç kesinti olmaması için gereken batarya (ardışık tepe yöntemi)
+    """
+    n = len(store)
+    deficit_days = np.empty(n)
+    longest = np.empty(n)
+    battery = np.empty(n)
+    for start, chunk in store.iter_chunks(chunk_size):
+        daily = daily_totals(chunk)
+        net = daily - daily_load_kWh
+        short = net < 0
+        rows = slice(start, start + len(chunk))
+        deficit_days[rows] = short.sum(axis=1)
+
+        # En uzun ardışık açık: son "fazla" günden bu yana geçen gün sayısının maksimumu
+        day_idx = np.arange(DAYS)[None, :]
+        last_ok = np.maximum.accumulate(np.where(short, -1, day_idx), axis=1)
+        longest[rows] = (day_idx - last_ok).max(axis=1)
+
+        # Gereken depolama: kümülatif net dengenin en büyük düşüşü
+        level = np.cumsum(net, axis=1)
+        peak = np.maximum.accumulate(np.maximum(level, 0), axis=1)
+        battery[rows] = (peak - level).max(axis=1)
+
+        # Serisi olmayan duraklar (koordinat ya da API hatası) NaN kalır
+        missing = np.isnan(daily).any(axis=1)
+        deficit_days[rows][missing] = np.nan
+        longest[rows][missing] = np.nan
+    return pd.DataFrame({'deficit_days': deficit_days, 'autonomy_days': longest,
+                         'battery_kWh': battery}, index=store.stop_ids)
+
+
+if __name__ == "__main__":
+    from storage import load_dataset, save_dataset
+
+    folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
+    parser = argparse.ArgumentParser(description="Durak başına saatlik üretim serileri ve batarya boyutlandırma")
+    parser.add_argument("--input", default=os.path.join(folder_path, "bus_tram_stops_with_irradiation.csv"))
+    parser.add_argument("--store", default=os.path.join(folder_path, "hourly_series"))
+    parser.add_argument("--output", default=os.path.join(folder_path, "hourly_summary.csv"))
+    parser.add_argument("--source", choices=["local", "pvgis"], default="local")
+    parser.add_argument("--tilt", type=float, default=0.0)
+    parser.add_argument("--peakpower", type=float, default=0.3, help="Durak başına panel gücü (kWp)")
+    parser.add_argument("--daily-load", type=float, default=0.5, help="Günlük tüketim (kWh)")
+    args = parser.parse_args()
+
+    df = load_dataset(args.input)
+    if args.source == "local":
+        store = build_local(df, args.store, tilt=args.tilt, peakpower=args.peakpower)
+    else:
+        from pvgis_client import PVGISFetcher, PVGIS_SERIES_URL
+        params = dict(SERIES_PARAMS, angle=args.tilt, peakpower=args.peakpower)
+        fetcher = PVGISFetcher(params, url=PVGIS_SERIES_URL, extract=hourly_power)
+        store = build_pvgis(df, args.store, fetcher)
+        fetcher.close()
+
+    summary = pd.concat([
+        monthly_totals(store).add_prefix('month_'),
+        worst_week(store),
+        autonomy(store, args.daily_load),
+    ], axis=1)
+    save_dataset(summary.rename_axis('stop_id').reset_index(), args.output)
+    print(f"{len(store)} durak için saatlik seriler: {args.store}.f32")
+    print(f"Ortalama en kötü hafta: {summary['worst_week_kWh'].mean():.2f} kWh")
+    print(f"Tüketimi karşılamayan gün (ortalama): {summary['deficit_days'].mean():.0f}")
+    print(f"Gereken batarya (medyan): {summary['battery_kWh'].median():.2f} kWh")
+    print(f"Özet kaydedildi: {args.output}")
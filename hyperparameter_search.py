@@ -0,0 +1,192 @@
+# Ardışık yarılama (successive halving) ile hiperparametre araması
+# Her turda adaylar artan örnek bütçesiyle değerlendirilir, yalnızca en iyi
+# 1/factor kadarı bir sonraki tura geçer. Katlar (fold) süreç havuzunda paralel
+# eğitilir. Sonuçlar SQLite'ta veri seti parmak izi + model + parametre + bütçe +
+# kat anahtarıyla saklanır; tekrar çalıştırmada tamamlanmış denemeler atlanır.
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+_X = None
+_y = None
+
+
+def dataset_fingerprint(X, y):
+    """Özellik matrisi ve etiketlerin içerik karması"""
+    h = hashlib.sha256()
+    for arr in (np.ascontiguousarray(X, dtype=float), np.ascontiguousarray(y)):
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    return h.hexdigest()[:16]
+
+
+class TrialStore:
+    """Kat başına deneme skorlarını tutan kalıcı SQLite deposu"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS trials (
+                   key TEXT PRIMARY KEY,
+                   fingerprint TEXT NOT NULL,
+                   model TEXT NOT NULL,
+                   params TEXT NOT NULL,
+                   budget INTEGER NOT NULL,
+                   fold INTEGER NOT NULL,
+                   score REAL NOT NULL,
+                   seconds REAL NOT NULL
+               )"""
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(fingerprint, model, params, budget, fold, cv, scoring):
+        """model: model_identity() çıktısı (temel parametreler ve random_state dahil)"""
+        model_hash = hashlib.sha256(model.encode()).hexdigest()[:16]
+        return f"{fingerprint}:{model_hash}:{json.dumps(params, sort_keys=True, default=str)}:" \
+               f"{budget}:{fold}/{cv}:{scoring}"
+
+    def get(self, key):
+        row = self.conn.execute("SELECT score FROM trials WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def put(self, key, fingerprint, model, params, budget, fold, score, seconds):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO trials VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, fingerprint, model, json.dumps(params, sort_keys=True, default=str),
+             int(budget), int(fold), float(score), float(seconds))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def model_identity(estimator, name, random_state):
+    """
+    Deneme anahtarındaki model kimliği: ad, temel kurucu parametreleri ve
+    alt örnekleme/kat bölmesini belirleyen random_state. Bunlardan biri
+    değişirse eski kat skorları yeniden kullanılmaz.
+    """
+    return json.dumps({
+        'name': name,
+        'params': estimator.get_params(),
+        'random_state': random_state,
+    }, sort_keys=True, default=str)
+
+
+def _init_worker(X, y):
+    global _X, _y
+    _X, _y = X, y
+
+
+def _fit_fold(estimator, params, train, test, scoring):
+    """Bir adayı bir katta eğit ve skorla (işçi süreçte çalışır)"""
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(_X[train], _y[train])
+    score = get_scorer(scoring)(model, _X[test], _y[test])
+    return score, time.perf_counter() - start
+
+
+def successive_halving(estimator, param_grid, X, y, name=None, cv=3, scoring='f1', factor=3,
+                       min_resources=None, store=None, workers=None, random_state=42, verbose=True):
+    """
+    Ardışık yarılama ile en iyi parametreleri bul.
+    Son turda bütçe tüm veri setidir; sonuç GridSearchCV.best_params_/best_score_ karşılığıdır.
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    name = name or type(estimator).__name__
+    model = model_identity(estimator, name, random_state)
+    fingerprint = dataset_fingerprint(X, y)
+    candidates = list(ParameterGrid(param_grid))
+    n_samples = len(y)
+
+    # Tur sayısı: aday sayısı 1'e inene kadar; ilk tur bütçesi buna göre seçilir
+    n_rounds = max(1, int(np.ceil(np.log(len(candidates)) / np.log(factor))) + 1)
+    if min_resources is None:
+        min_resources = max(cv * 10 * len(np.unique(y)), n_samples // factor ** (n_rounds - 1))
+    order = np.random.RandomState(random_state).permutation(n_samples)
+    workers = workers or os.cpu_count() or 1
+
+    history = []
+    stats = {'computed': 0, 'cached': 0}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as executor:
+        for round_no in range(n_rounds):
+            last_round = round_no == n_rounds - 1 or len(candidates) == 1
+            budget = n_samples if last_round else min(n_samples, min_resources * factor ** round_no)
+            subset = np.sort(order[:budget])
+            folds = list(StratifiedKFold(cv, shuffle=True, random_state=random_state)
+                         .split(subset, y[subset]))
+
+            scores = np.full((len(candidates), cv), np.nan)
+            futures = {}
+            for c, params in enumerate(candidates):
+                for fold, (train, test) in enumerate(folds):
+                    key = TrialStore.make_key(fingerprint, model, params, budget, fold, cv, scoring)
+                    cached = store.get(key) if store is not None else None
+                    if cached is not None:
+                        scores[c, fold] = cached
+                        stats['cached'] += 1
+                        continue
+                    future = executor.submit(_fit_fold, estimator, params, subset[train], subset[test], scoring)
+                    futures[future] = (c, fold, key)
+
+            for future, (c, fold, key) in futures.items():
+                score, seconds = future.result()
+                scores[c, fold] = score
+                stats['computed'] += 1
+                if store is not None:
+                    store.put(key, fingerprint, model, candidates[c], budget, fold, score, seconds)
+
+            mean = scores.mean(axis=1)
+            history.extend({'round': round_no, 'budget': budget, 'params': params, 'score': s}
+                           for params, s in zip(candidates, mean))
+            all_nan = bool(np.all(np.isnan(mean)))
+            if verbose:
+                best_text = 'yok (tüm skorlar NaN)' if all_nan else f"{np.nanmax(mean):.3f}"
+                print(f"{name} tur {round_no + 1}: {len(candidates)} aday, {budget} örnek, "
+                      f"en iyi skor {best_text}")
+            if last_round:
+                break
+            keep = max(1, int(np.ceil(len(candidates) / factor)))
+            best = np.argsort(-np.nan_to_num(mean, nan=-np.inf), kind='stable')[:keep]
+            candidates = [candidates[i] for i in best]
+
+    stats['elapsed'] = time.perf_counter() - start
+    if verbose:
+        print(f"{name}: {stats['computed']} deneme hesaplandı, {stats['cached']} deneme önbellekten "
+              f"({stats['elapsed']:.1f} sn)")
+    if all_nan:
+        # Son turdaki tüm kat skorları NaN: seçilebilecek bir aday yok
+        print(f"Uyarı: {name} için son turda geçerli skor yok, en iyi parametre seçilemedi")
+        best_params, best_score = None, float('nan')
+    else:
+        best = int(np.nanargmax(mean))
+        best_params, best_score = candidates[best], float(mean[best])
+    return {
+        'best_params': best_params,
+        'best_score': best_score,
+        'history': pd.DataFrame(history),
+        'stats': stats,
+    }
+
+
+def cached_cv_score(estimator, X, y, cv=5, scoring='roc_auc', name=None, store=None, workers=None):
+    """cross_val_score(...).mean() karşılığı; katlar paralel, sonuçlar önbellekli"""
+    result = successive_halving(estimator, {}, X, y, name=name, cv=cv, scoring=scoring,
+                                store=store, workers=workers, verbose=False)
+    return result['best_score']
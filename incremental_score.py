@@ -0,0 +1,120 @@
+# Uygunluk skorunun artımlı güncellenmesi
+# calculate_suitability_score ile aynı formül: özellikler min-max ile normalize edilir,
+# ağırlıklı toplam alınır ve sonuç 0-100 aralığına ölçeklenir.
+# Durum (özellik değerleri, min/max sınırları, ham skorlar) diskte saklanır; günlük
+# güncellemelerde yalnızca değişen/eklenen duraklar yeniden hesaplanır. Tüm skorlar
+# ancak bir özelliğin min/max sınırı gerçekten değiştiğinde yeniden ölçeklenir.
+
+import joblib
+import numpy as np
+import pandas as pd
+
+SCORE_FEATURES = ['irradiation_kWh', 'metro_distance', 'passenger_density',
+                  'building_density', 'shading_factor']
+
+# Ağırlıklar (bu değerler ayarlanabilir)
+SCORE_WEIGHTS = {
+    'irradiation_kWh': 0.4,        # Güneşlenme potansiyeli
+    'metro_distance': -0.2,        # Metroya yakınlık (negatif çünkü uzaklık)
+    'passenger_density': 0.2,      # Yolcu yoğunluğu
+    'building_density': -0.1,      # Bina yoğunluğu (negatif çünkü gölgelenme)
+    'shading_factor': -0.1         # Gölgelenme faktörü (negatif çünkü gölge)
+}
+
+
+class IncrementalScorer:
+    """Min/max ve ham skor durumunu tutan artımlı uygunluk skorlayıcı"""
+
+    def __init__(self, weights=SCORE_WEIGHTS, key_col='stop_id'):
+        self.weights = dict(weights)
+        self.features = list(self.weights)
+        self.key_col = key_col
+        self.values = pd.DataFrame(columns=self.features, dtype=float)
+        self.raw = pd.Series(dtype=float)
+        self.low = pd.Series(np.nan, index=self.features)
+        self.high = pd.Series(np.nan, index=self.features)
+        self.stats = {'updates': 0, 'rows_rescored': 0, 'full_rescales': 0}
+
+    def _frame(self, df):
+        frame = df.set_index(df[self.key_col].astype(str))[self.features].astype(float)
+        return frame[~frame.index.duplicated(keep='last')]
+
+    def _raw_scores(self, values):
+        """Ağırlıklı toplam; MinMaxScaler gibi sabit sütunlar 0'a normalize edilir"""
+        span = (self.high - self.low).replace(0, 1)
+        normalized = (values - self.low) / span
+        return normalized.to_numpy() @ np.array([self.weights[f] for f in self.features])
+
+    def fit(self, df):
+        """Tüm tablodan durumu sıfırdan kur"""
+        self.values = self._frame(df)
+        self.low = self.values.min()
+        self.high = self.values.max()
+        self.raw = pd.Series(self._raw_scores(self.values), index=self.values.index)
+        return self
+
+    def scores(self):
+        """0-100 skorlar (ölçekleme okuma anında, tembel olarak yapılır)"""
+        low, high = self.raw.min(), self.raw.max()
+        return (self.raw - low) / (high - low) * 100
+
+    def ranks(self):
+        return self.scores().rank(ascending=False, method='first')
+
+    def update(self, df, remove_missing=False):
+        """
+        Değişen/eklenen durakları uygula (remove_missing: df'te olmayanları sil).
+        Sırası değişen duraklar için eski/yeni sıra ve skor tablosunu döndürür.
+        """
+        old_scores = self.scores()
+        old_ranks = old_scores.rank(ascending=False, method='first')
+        new = self._frame(df)
+
+        # Yalnızca gerçekten değişen satırlar (NaN == NaN kabul edilir)
+        current = self.values.reindex(new.index)
+        same = (current == new) | (current.isna() & new.isna())
+        changed = new.index[~same.all(axis=1)]
+        removed = self.values.index.difference(new.index) if remove_missing else pd.Index([])
+
+        # Eski değeri bir sınıra eşit olan satırlar değiştiyse o sınır yeniden aranmalı
+        touched = self.values.reindex(changed.union(removed).intersection(self.values.index))
+        stale = ((touched == self.low) | (touched == self.high)).any()
+
+        self.values = pd.concat([self.values.drop(changed.intersection(self.values.index).union(removed)),
+                                 new.loc[changed]])
+        self.raw = self.raw.drop(self.raw.index.intersection(changed.union(removed)))
+
+        low, high = self.low.copy(), self.high.copy()
+        for feature in self.features:
+            column = self.values[feature]
+            if stale[feature]:
+                low[feature], high[feature] = column.min(), column.max()
+            else:
+                low[feature] = np.nanmin([low[feature], new.loc[changed, feature].min()])
+                high[feature] = np.nanmax([high[feature], new.loc[changed, feature].max()])
+
+        bounds_moved = not (low.equals(self.low) and high.equals(self.high))
+        self.low, self.high = low, high
+        if bounds_moved:
+            self.raw = pd.Series(self._raw_scores(self.values), index=self.values.index)
+            self.stats['full_rescales'] += 1
+            self.stats['rows_rescored'] += len(self.values)
+        else:
+            self.raw = pd.concat([self.raw, pd.Series(self._raw_scores(new.loc[changed]), index=changed)])
+            self.stats['rows_rescored'] += len(changed)
+        self.raw = self.raw.reindex(self.values.index)
+        self.stats['updates'] += 1
+
+        new_scores = self.scores()
+        diff = pd.DataFrame({'old_rank': old_ranks, 'new_rank': self.ranks(),
+                             'old_score': old_scores, 'new_score': new_scores})
+        moved = diff['old_rank'].ne(diff['new_rank']) & diff[['old_rank', 'new_rank']].notna().any(axis=1)
+        diff = diff[moved]
+        return diff.rename_axis(self.key_col).sort_values('new_rank', na_position='last')
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
@@ -0,0 +1,130 @@
+# PVGIS güneşlenme sonuçları için kalıcı SQLite önbelleği
+# Anahtar: ızgaraya yuvarlanmış enlem/boylam + istek parametreleri
+
+import json
+import sqlite3
+import threading
+import time
+
+# Önbellek anahtarına girmeyen parametreler (sonucu etkilemez)
+IGNORED_PARAMS = {"lat", "lon", "outputformat", "browser"}
+
+# Erişim zamanları bellekte biriktirilir; bu kadar birikince (ya da sonraki
+# put_many/close'da) tek işlemde yazılır. Okumalar yazma kilidi tutmaz.
+ACCESS_FLUSH_SIZE = 500
+
+
+class IrradiationCache:
+    """TTL ve boyut sınırlı, isabet/ıska sayaçlı kalıcı önbellek"""
+
+    def __init__(self, path, grid=0.001, ttl_days=365, max_entries=200000):
+        self.path = path
+        self.grid = grid
+        self.ttl = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._accessed = {}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS irradiation (
+                   key TEXT PRIMARY KEY,
+                   value REAL NOT NULL,
+                   created REAL NOT NULL,
+                   accessed REAL NOT NULL
+               )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON irradiation (accessed)")
+        self.conn.commit()
+
+    def make_key(self, lat, lon, params):
+        """Koordinatı ızgaraya yuvarla ve parametrelerle birleştir"""
+        qlat = round(float(lat) / self.grid)
+        qlon = round(float(lon) / self.grid)
+        relevant = {k: v for k, v in (params or {}).items() if k not in IGNORED_PARAMS}
+        return f"{qlat}:{qlon}:{self.grid}:" + json.dumps(relevant, sort_keys=True)
+
+    def get(self, lat, lon, params=None):
+        key = self.make_key(lat, lon, params)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created FROM irradiation WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            if self.ttl is not None and now - created > self.ttl:
+                self.conn.execute("DELETE FROM irradiation WHERE key = ?", (key,))
+                self.conn.commit()
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_accessed()
+                self.conn.commit()
+            self.hits += 1
+            return value
+
+    def _flush_accessed(self):
+        """Biriken erişim zamanlarını yaz (çağıran kilidi tutar ve commit eder)"""
+        if self._accessed:
+            self.conn.executemany(
+                "UPDATE irradiation SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def put(self, lat, lon, params, value):
+        if value is None:
+            return
+        self.put_many([(lat, lon, value)], params)
+
+    def put_many(self, items, params=None):
+        """(lat, lon, value) üçlülerini tek işlemde yaz"""
+        now = time.time()
+        rows = [(self.make_key(lat, lon, params), float(value), now, now)
+                for lat, lon, value in items if value is not None]
+        if not rows:
+            return
+        with self.lock:
+            # Tahliye sırası için erişim zamanları güncel olmalı
+            self._flush_accessed()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO irradiation (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Süresi dolanları ve boyut sınırını aşan en eski kayıtları sil"""
+        if self.ttl is not None:
+            self.conn.execute("DELETE FROM irradiation WHERE created < ?", (time.time() - self.ttl,))
+        if self.max_entries:
+            count = self.conn.execute("SELECT COUNT(*) FROM irradiation").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM irradiation WHERE key IN "
+                    "(SELECT key FROM irradiation ORDER BY accessed LIMIT ?)",
+                    (excess,)
+                )
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": self.conn.execute("SELECT COUNT(*) FROM irradiation").fetchone()[0],
+            }
+
+    def close(self):
+        with self.lock:
+            self._flush_accessed()
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,164 @@
+# Durakları tek bir folium katmanı olarak çizmek için ortak yardımcılar
+# Her durak için ayrı CircleMarker nesnesi üretmek yerine tüm veriler
+# sütun dizileri halinde tek bir JSON bloğuna yazılır; işaretçiler tarayıcıda
+# canvas üzerinde oluşturulur ve popup HTML'i yalnızca tıklanınca üretilir.
+
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from jinja2 import Template
+
+import metrics
+
+# Renk skalası bu kadar adımda örneklenir (görsel olarak ayırt edilemez)
+PALETTE_SIZE = 256
+
+
+def colormap_palette(colormap, values, size=PALETTE_SIZE):
+    """
+    Değerleri renk skalasına vektörel olarak eşle.
+    (palet, palet indeksleri) döndürür.
+    """
+    values = np.asarray(values, dtype=float)
+    vmin, vmax = float(colormap.vmin), float(colormap.vmax)
+    palette = [colormap(v) for v in np.linspace(vmin, vmax, size)]
+    if vmax > vmin:
+        scaled = (np.clip(values, vmin, vmax) - vmin) / (vmax - vmin)
+    else:
+        scaled = np.zeros(len(values))
+    indices = np.rint(np.nan_to_num(scaled) * (size - 1)).astype(int)
+    return palette, indices
+
+
+def categorical_palette(colors):
+    """Hazır renk dizisini (palet, indeksler) biçimine dönüştür"""
+    palette, indices = np.unique(np.asarray(colors, dtype=str), return_inverse=True)
+    return palette.tolist(), indices
+
+
+def _json_list(series):
+    """NaN değerleri None yaparak JSON'a uygun liste üret"""
+    series = pd.Series(series)
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+class StopLayer(MacroElement):
+    """Tüm durakları tek seferde ekleyen hafif Leaflet katmanı"""
+
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var data = {{ this.data|tojson }};
+            var parent = {{ this._parent.get_name() }};
+            var renderer = L.canvas({padding: 0.5});
+
+            function escapeHtml(value) {
+                return String(value).replace(/[&<>"']/g, function(c) {
+                    return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+                });
+            }
+
+            function popupHtml(i) {
+                var html = "<div style='font-family: Arial; width: 200px;'>";
+                if (data.title) {
+                    html += "<h4 style='margin-bottom: 5px;'>" + escapeHtml(data.title[i]) + "</h4>";
+                }
+                data.fields.forEach(function(field) {
+                    var value = field.values[i];
+                    if (value === null) { return; }
+                    if (field.digits !== null && typeof value === 'number') {
+                        value = value.toFixed(field.digits);
+                    }
+                    html += "<p style='margin: 2px 0;'>" + field.label + ": " +
+                            escapeHtml(value) + field.suffix + "</p>";
+                });
+                return html + "</div>";
+            }
+
+            var layers = [];
+            for (var i = 0; i < data.lat.length; i++) {
+                var color = data.palette[data.color[i]];
+                var marker = L.circleMarker([data.lat[i], data.lon[i]], {
+                    renderer: renderer,
+                    radius: Array.isArray(data.radius) ? data.radius[i] : data.radius,
+                    color: color,
+                    fill: true,
+                    fillColor: color,
+                    fillOpacity: data.fill_opacity
+                });
+                if (data.tooltip) {
+                    marker.bindTooltip(escapeHtml(data.tooltip[i]));
+                }
+                if (data.title || data.fields.length) {
+                    marker.bindPopup((function(i) {
+                        return function() { return popupHtml(i); };
+                    })(i), {maxWidth: 300});
+                }
+                layers.push(marker);
+            }
+
+            if (parent.addLayers) {
+                parent.addLayers(layers);
+                return parent;
+            }
+            return L.featureGroup(layers).addTo(parent);
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, data):
+        super().__init__()
+        self._name = 'StopLayer'
+        self.data = data
+
+
+@metrics.timed()
+def add_stop_layer(parent, df, color_values=None, colormap=None, colors='blue', radius=5,
+                   title_col='stop_name', popup_fields=(), tooltip=None, fill_opacity=0.7,
+                   lat_col='stop_lat', lon_col='stop_lon'):
+    """
+    Durakları harita ya da MarkerCluster üzerine tek katman olarak ekle.
+
+    color_values + colormap verilirse renkler skaladan vektörel hesaplanır,
+    aksi halde `colors` (tek renk ya da durak başına renk dizisi) kullanılır.
+    popup_fields: (etiket, sütun, ondalık basamak, sonek) dörtlüleri.
+    tooltip: sütun adı ya da durak başına metin dizisi.
+    """
+    valid = df[lat_col].notna().to_numpy() & df[lon_col].notna().to_numpy()
+    df = df[valid]
+
+    if colormap is not None:
+        palette, color_idx = colormap_palette(colormap, np.asarray(color_values, dtype=float)[valid])
+    elif isinstance(colors, str):
+        palette, color_idx = [colors], np.zeros(len(df), dtype=int)
+    else:
+        palette, color_idx = categorical_palette(np.asarray(colors)[valid])
+
+    if np.ndim(radius) == 0:
+        radius_data = float(radius)
+    else:
+        radius_data = np.round(np.asarray(radius, dtype=float)[valid], 2).tolist()
+
+    if isinstance(tooltip, str):
+        tooltip = df[tooltip]
+    elif tooltip is not None:
+        tooltip = np.asarray(tooltip, dtype=object)[valid]
+
+    data = {
+        'lat': np.round(df[lat_col].to_numpy(dtype=float), 6).tolist(),
+        'lon': np.round(df[lon_col].to_numpy(dtype=float), 6).tolist(),
+        'palette': palette,
+        'color': color_idx.tolist(),
+        'radius': radius_data,
+        'fill_opacity': fill_opacity,
+        'title': _json_list(df[title_col]) if title_col else None,
+        'tooltip': _json_list(tooltip) if tooltip is not None else None,
+        'fields': [
+            {'label': label, 'values': _json_list(df[col]), 'digits': digits, 'suffix': suffix}
+            for label, col, digits, suffix in popup_fields
+        ],
+    }
+
+    layer = StopLayer(data)
+    layer.add_to(parent)
+    return layer
@@ -0,0 +1,264 @@
+# Sıcak yollar için hafif ölçüm katmanı: zamanlayıcı, sayaç, histogram
+# Varsayılan olarak kapalıdır; kapalıyken her çağrı yalnızca bir bayrak kontrolüdür.
+# Ortam değişkenleriyle açılır:
+#   ECOHALT_METRICS=1              ölçümü aç
+#   ECOHALT_METRICS_FILE=yol.jsonl her zamanlayıcı olayını JSONL izine ekle
+#   ECOHALT_METRICS_PORT=9108      Prometheus metin biçimini /metrics'te sun
+# ya da kod içinden enable(...) ile.
+
+import argparse
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus varsayılan süre kovaları (saniye)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+enabled = False
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_trace = None
+_server = None
+
+
+class _Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+
+def count(name, value=1, **labels):
+    """Sayacı artır"""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    """Histograma bir değer ekle (ör. süre, boyut)"""
+    if not enabled:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.observe(value)
+
+
+def _record(name, seconds, labels, error=False):
+    observe(name + '_seconds', seconds, **labels)
+    if error:
+        count(name + '_errors_total', **labels)
+    if _trace is not None:
+        event = {'ts': time.time(), 'name': name, 'seconds': round(seconds, 6),
+                 'pid': os.getpid(), 'thread': threading.current_thread().name}
+        if labels:
+            event['labels'] = labels
+        if error:
+            event['error'] = True
+        line = json.dumps(event, ensure_ascii=False) + '\n'
+        with _lock:
+            _trace.write(line)
+
+
+class _Timer:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, time.perf_counter() - self.start, self.labels, exc_type is not None)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name, **labels):
+    """with metrics.timer('ad'): ... — kapalıyken paylaşılan boş nesne döner"""
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def timed(name=None, **labels):
+    """Fonksiyon süresini ölçen dekoratör"""
+    def decorator(func):
+        metric = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = func(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                _record(metric, time.perf_counter() - start, labels, error)
+        return wrapper
+    return decorator
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+def prometheus_text():
+    """Tüm ölçümleri Prometheus metin biçiminde döndür"""
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: (list(h.counts), h.sum, h.count, h.buckets) for key, h in _histograms.items()}
+    for name in sorted({key[0] for key in counters}):
+        lines.append(f"# TYPE ecohalt_{name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"ecohalt_{name}{_format_labels(labels)} {value}")
+    for name in sorted({key[0] for key in histograms}):
+        lines.append(f"# TYPE ecohalt_{name} histogram")
+        for (metric, labels), (counts, total, n, buckets) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f"ecohalt_{name}_bucket{_format_labels(labels, {'le': bound})} {cumulative}")
+            lines.append(f"ecohalt_{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"ecohalt_{name}_count{_format_labels(labels)} {n}")
+    return '\n'.join(lines) + '\n'
+
+
+def summary():
+    """Süre histogramlarının özeti: {ad: (çağrı, toplam sn)}"""
+    with _lock:
+        return {key[0] + _format_labels(key[1]): (h.count, round(h.sum, 4))
+                for key, h in _histograms.items()}
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=9108, host="127.0.0.1"):
+    """Prometheus uç noktasını arka planda başlat (süreç başına bir kez)"""
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def enable(trace_file=None, port=None):
+    """Ölçümü aç; istenirse JSONL izini ve Prometheus uç noktasını başlat"""
+    global enabled, _trace
+    enabled = True
+    if trace_file and _trace is None:
+        # Satır tamponlu: her olay hemen dosyaya yazılır
+        _trace = open(trace_file, 'a', encoding='utf-8', buffering=1)
+    if port:
+        serve(int(port))
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def summarize_trace(path):
+    """JSONL izini ada göre özetle: çağrı, toplam, p50, p95, en uzun (sn)"""
+    durations = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            event = json.loads(line)
+            durations.setdefault(event['name'], []).append(event['seconds'])
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({
+            'name': name,
+            'calls': len(values),
+            'total': sum(values),
+            'p50': values[len(values) // 2],
+            'p95': values[min(len(values) - 1, int(len(values) * 0.95))],
+            'max': values[-1],
+        })
+    return sorted(rows, key=lambda row: -row['total'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL ölçüm izini özetle")
+    parser.add_argument("trace", help="ECOHALT_METRICS_FILE ile yazılan iz dosyası")
+    args = parser.parse_args()
+
+    print(f"{'ad':28s} {'çağrı':>7s} {'toplam sn':>10s} {'p50 ms':>9s} {'p95 ms':>9s} {'en uzun ms':>11s}")
+    for row in summarize_trace(args.trace):
+        print(f"{row['name']:28s} {row['calls']:7d} {row['total']:10.3f} {row['p50'] * 1000:9.2f} "
+              f"{row['p95'] * 1000:9.2f} {row['max'] * 1000:11.2f}")
+
+
+if os.environ.get('ECOHALT_METRICS', '').lower() in ('1', 'true', 'yes'):
+    enable(os.environ.get('ECOHALT_METRICS_FILE'), os.environ.get('ECOHALT_METRICS_PORT'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# En yakın U-/S-Bahn istasyonuna gerçek uzaklık
+# İstasyonlar GTFS routes.txt / trips.txt / stop_times.txt üzerinden bulunur,
+# haversine BallTree ile tüm duraklar için tek bir vektörel sorgu yapılır
+# (O(n log m)). İndeks GTFS dosyaları değişmediği sürece diskte önbelleklenir.
+
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from gtfs_loader import read_stops
+
+EARTH_RADIUS_M = 6371000.0
+
+# GTFS route_type değerleri: 1 = metro (standart), 109 = S-Bahn,
+# 400-403 = şehir içi raylı sistem / U-Bahn (genişletilmiş tipler)
+RAIL_ROUTE_TYPES = {1, 109, 400, 401, 402, 403}
+
+GTFS_FILES = ['routes.txt', 'trips.txt', 'stop_times.txt', 'stops.txt']
+
+
+def _feed_fingerprint(gtfs_folder, route_types):
+    """GTFS dosyalarının boyut/değişiklik zamanına göre kısa parmak izi"""
+    h = hashlib.sha256()
+    for name in GTFS_FILES:
+        stat = os.stat(os.path.join(gtfs_folder, name))
+        h.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    h.update(str(sorted(route_types)).encode())
+    return h.hexdigest()[:16]
+
+
+def find_rail_stations(gtfs_folder, route_types=RAIL_ROUTE_TYPES, chunksize=1000000):
+    """U-/S-Bahn hatlarının uğradığı durakları (koordinatlarıyla) döndür"""
+    routes = pd.read_csv(os.path.join(gtfs_folder, 'routes.txt'),
+                         usecols=['route_id', 'route_type'],
+                         dtype={'route_id': 'string', 'route_type': 'int32'})
+    rail_routes = routes.loc[routes['route_type'].isin(route_types), 'route_id']
+
+    trips = pd.read_csv(os.path.join(gtfs_folder, 'trips.txt'),
+                        usecols=['route_id', 'trip_id'], dtype='string')
+    rail_trips = pd.Index(trips.loc[trips['route_id'].isin(rail_routes), 'trip_id'])
+
+    # stop_times.txt çok büyük olabilir; parça parça okunur
+    station_ids = set()
+    for chunk in pd.read_csv(os.path.join(gtfs_folder, 'stop_times.txt'),
+                             usecols=['trip_id', 'stop_id'], dtype='string',
+                             chunksize=chunksize):
+        station_ids.update(chunk.loc[chunk['trip_id'].isin(rail_trips), 'stop_id'].unique())
+
+    stops = read_stops(os.path.join(gtfs_folder, 'stops.txt'),
+                       columns=['stop_id', 'stop_name', 'stop_lat', 'stop_lon'])
+    stations = stops[stops['stop_id'].isin(station_ids)].dropna(subset=['stop_lat', 'stop_lon'])
+    return stations.reset_index(drop=True)
+
+
+def load_station_index(gtfs_folder, cache_file=None, route_types=RAIL_ROUTE_TYPES):
+    """İstasyon BallTree'sini önbellekten yükle ya da oluştur"""
+    cache_file = cache_file or os.path.join(gtfs_folder, 'metro_station_index.joblib')
+    fingerprint = _feed_fingerprint(gtfs_folder, route_types)
+
+    if os.path.exists(cache_file):
+        cached = joblib.load(cache_file)
+        if cached.get('fingerprint') == fingerprint:
+            return cached['stations'], cached['tree']
+
+    stations = find_rail_stations(gtfs_folder, route_types)
+    print(f"{len(stations)} U-/S-Bahn istasyon noktası bulundu, indeks oluşturuluyor...")
+    tree = None
+    if len(stations):
+        tree = BallTree(np.radians(stations[['stop_lat', 'stop_lon']].to_numpy()), metric='haversine')
+    joblib.dump({'fingerprint': fingerprint, 'stations': stations, 'tree': tree}, cache_file)
+    return stations, tree
+
+
+def compute_metro_distance(df, gtfs_folder, cache_file=None, lat_col='stop_lat', lon_col='stop_lon'):
+    """Her durak için en yakın U-/S-Bahn istasyonuna uzaklık (metre)"""
+    _, tree = load_station_index(gtfs_folder, cache_file)
+
+    coords = df[[lat_col, lon_col]].to_numpy(dtype=float)
+    valid = ~np.isnan(coords).any(axis=1)
+    distance = np.full(len(df), np.nan)
+    if valid.any() and tree is not None:
+        dist, _ = tree.query(np.radians(coords[valid]), k=1)
+        distance[valid] = dist[:, 0] * EARTH_RADIUS_M
+    return distance
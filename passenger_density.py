@@ -0,0 +1,105 @@
+# GTFS sefer sıklığından yolcu yoğunluğu göstergesi
+# stop_times.txt parça parça okunur; her parçada durak başına kalkışlar,
+# seferin hizmet verdiği gün sayısıyla ağırlıklandırılarak toplanır.
+# Parçalar süreç havuzunda paralel işlenir, bellekte yalnızca birkaç parça bulunur.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+_trip_weights = None
+
+
+def service_active_days(gtfs_folder):
+    """
+    Her service_id'nin takvim dönemindeki aktif gün sayısı ve dönem uzunluğu.
+    calendar_dates.txt varsa eklenen/çıkarılan günler de hesaba katılır.
+    """
+    calendar_file = os.path.join(gtfs_folder, 'calendar.txt')
+    dates_file = os.path.join(gtfs_folder, 'calendar_dates.txt')
+    active = pd.Series(dtype=float)
+    first, last = None, None
+
+    if os.path.exists(calendar_file):
+        calendar = pd.read_csv(calendar_file, dtype={'service_id': 'string',
+                                                     'start_date': 'string', 'end_date': 'string'})
+        start = pd.to_datetime(calendar['start_date'], format='%Y%m%d')
+        end = pd.to_datetime(calendar['end_date'], format='%Y%m%d')
+        first, last = start.min(), end.max()
+
+        # Her hafta günü için dönemdeki o günlerin sayısı (vektörel)
+        days = np.zeros(len(calendar))
+        for weekday, name in enumerate(WEEKDAYS):
+            offset = (weekday - start.dt.weekday) % 7
+            first_day = start + pd.to_timedelta(offset, unit='D')
+            count = ((end - first_day).dt.days // 7 + 1).clip(lower=0)
+            days += calendar[name].to_numpy() * count.to_numpy()
+        active = pd.Series(days, index=calendar['service_id'])
+
+    if os.path.exists(dates_file):
+        dates = pd.read_csv(dates_file, dtype={'service_id': 'string', 'date': 'string'})
+        parsed = pd.to_datetime(dates['date'], format='%Y%m%d')
+        first = parsed.min() if first is None else min(first, parsed.min())
+        last = parsed.max() if last is None else max(last, parsed.max())
+        # exception_type 1 = gün eklendi, 2 = gün kaldırıldı
+        delta = dates['exception_type'].map({1: 1, 2: -1}).groupby(dates['service_id']).sum()
+        active = active.add(delta, fill_value=0)
+
+    period_days = max((last - first).days + 1, 1) if first is not None else 1
+    return active.clip(lower=0), period_days
+
+
+def _init_worker(trip_weights):
+    global _trip_weights
+    _trip_weights = trip_weights
+
+
+def _aggregate_chunk(chunk):
+    """Bir parçada durak başına ağırlıklı kalkış sayısı"""
+    weights = chunk['trip_id'].map(_trip_weights).fillna(0)
+    return weights.groupby(chunk['stop_id']).sum()
+
+
+def compute_departures(gtfs_folder, chunksize=1000000, workers=None):
+    """Durak başına ortalama günlük kalkış sayısı (stop_id indeksli Series)"""
+    active, period_days = service_active_days(gtfs_folder)
+
+    trips = pd.read_csv(os.path.join(gtfs_folder, 'trips.txt'),
+                        usecols=['trip_id', 'service_id'], dtype='string')
+    trip_weights = trips.set_index('trip_id')['service_id'].map(active).fillna(0).astype(float)
+
+    workers = workers or os.cpu_count() or 1
+    totals = []
+    reader = pd.read_csv(os.path.join(gtfs_folder, 'stop_times.txt'),
+                         usecols=['trip_id', 'stop_id'], dtype='string', chunksize=chunksize)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(trip_weights,)) as executor:
+        pending = []
+        for chunk in reader:
+            pending.append(executor.submit(_aggregate_chunk, chunk))
+            # Bellekte en fazla 2 * workers parça tut
+            if len(pending) >= 2 * workers:
+                totals.append(pending.pop(0).result())
+        totals.extend(future.result() for future in pending)
+
+    if not totals:
+        return pd.Series(dtype=float, name='daily_departures')
+    departures = pd.concat(totals).groupby(level=0).sum() / period_days
+    departures.name = 'daily_departures'
+    return departures
+
+
+def passenger_density(df, gtfs_folder, key_col='stop_id', **kwargs):
+    """
+    Sefer sıklığını 0-100 ölçeğinde yolcu yoğunluğu göstergesine çevir.
+    (yoğunluk, günlük kalkış) dizilerini döndürür.
+    """
+    departures = compute_departures(gtfs_folder, **kwargs)
+    daily = df[key_col].astype(str).map(departures).fillna(0).to_numpy()
+    max_daily = daily.max() if len(daily) else 0
+    density = daily / max_daily * 100 if max_daily > 0 else np.zeros(len(daily))
+    return density, daily
@@ -0,0 +1,284 @@
+# Betik zinciri için bağımlılık grafiği (DAG) çalıştırıcısı
+# Her aşama girdi ve çıktı dosyalarıyla tanımlanır. Aşamanın parmak izi; girdi
+# dosyalarının içerik karması, betiğin ve içe aktardığı yerel modüllerin kaynak
+# kodu ve parametrelerden oluşur. Parmak izi değişmemiş ve çıktılar kaydedildiği
+# haliyle duruyorsa aşama atlanır. Birbirine bağlı olmayan aşamalar (ör. harita
+# çizimleri) paralel çalışır. Durum GTFS klasöründeki .pipeline_state.json'dadır.
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+
+folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
+# Bazı betikler "GTFS/..." göreli yollarını kullanır; aşamalar proje kökünde çalışır
+PROJECT_ROOT = os.path.dirname(folder_path)
+CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(folder_path, ".pipeline_state.json")
+
+# Metro uzaklığı ve yolcu yoğunluğu için kullanılan GTFS dosyaları
+GTFS_FEED = ['stops.txt', 'routes.txt', 'trips.txt', 'stop_times.txt', 'calendar.txt', 'calendar_dates.txt']
+
+
+def data(*names):
+    return [os.path.join(folder_path, name) for name in names]
+
+
+class Stage:
+    """Bir betik, girdileri, çıktıları ve parametreleri"""
+
+    def __init__(self, name, script, inputs=(), outputs=(), args=(), params=None, default=True):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.args = list(args)
+        self.params = dict(params or {})
+        self.default = default
+
+
+# visualize_scores.py, visualize_scores_v2.py ile aynı dosyaya yazdığı için grafikte yalnızca v2 var
+STAGES = [
+    Stage('check_stops', 'check_stops.py', data('stops.txt')),
+    Stage('solar_analysis', 'solar_analysis.py', data('stops.txt'), data('stops_with_irradiation.csv')),
+    Stage('bus_tram_data', 'create_bus_tram_data.py', data('stops.txt'),
+          data('bus_tram_stops_with_irradiation.csv')),
+    Stage('enhanced_analysis', 'enhanced_analysis.py',
+          # Artımlı skor durumu hem okunur hem yazılır; ilk çalıştırmada yoktur
+          data('bus_tram_stops_with_irradiation.csv', *GTFS_FEED, 'buildings.gpkg', 'dsm.tif',
+               'suitability_state.joblib'),
+          data('enhanced_solar_analysis.csv', 'top_recommendations.csv', 'enhanced_solar_map.html',
+               'suitability_state.joblib', 'rank_changes.csv')),
+    Stage('train_model', 'train_model.py', data('enhanced_solar_analysis.csv'),
+          data('solar_stop_model.joblib', 'solar_stop_scaler.joblib', 'model_features.txt',
+               'solar_stop_model_compiled.npz')),
+    Stage('advanced_modeling', 'advanced_modeling.py', data('enhanced_solar_analysis.csv'), default=False),
+    Stage('suitability_score', 'suitability_score.py', data('stops_with_irradiation.csv', *GTFS_FEED),
+          data('scored_solar_stops.csv')),
+    Stage('top10_solar_stops', 'top10_solar_stops.py', data('stops_with_irradiation.csv'),
+          data('top10_solar_stops.csv')),
+    Stage('gtfs_maps', 'gtfs_analysis.py', data('stops.txt', 'stops_with_irradiation.csv'),
+          data('berlin_stops_map.html', 'berlin_zentrum_stops.html', 'berlin_solar_stops_map.html')),
+    Stage('bus_tram_map', 'bus_tram_solar_map.py', data('bus_tram_stops_with_irradiation.csv'),
+          data('bus_tram_solar_map.html')),
+    Stage('scores_map', 'visualize_scores_v2.py', data('scored_solar_stops.csv'), data('scored_stops_map.html')),
+    Stage('scores_map_enhanced', 'visualize_scores_v3.py', data('scored_solar_stops.csv'),
+          data('scored_stops_map_enhanced.html')),
+    Stage('scores_map_advanced', 'visualize_scores_v4.py', data('scored_solar_stops.csv'),
+          data('scored_stops_map_advanced.html')),
+]
+
+
+class Pipeline:
+    def __init__(self, stages=STAGES, state_file=STATE_FILE, jobs=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.jobs = jobs or os.cpu_count() or 1
+
+        # Her çıktının tek bir üreticisi olmalı
+        self.producer = {}
+        for stage in stages:
+            for path in stage.outputs:
+                if path in self.producer:
+                    raise ValueError(f"{path} hem {self.producer[path]} hem {stage.name} tarafından üretiliyor")
+                self.producer[path] = stage.name
+        # Aşamanın kendi ürettiği girdi (ör. artımlı durum dosyası) bağımlılık sayılmaz
+        self.deps = {stage.name: sorted({self.producer[p] for p in stage.inputs
+                                         if p in self.producer and self.producer[p] != stage.name})
+                     for stage in stages}
+
+        self.state = {'stages': {}, 'hashes': {}}
+        if os.path.exists(state_file):
+            with open(state_file, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def file_hash(self, path):
+        """İçerik karması; boyut ve değişiklik zamanı aynıysa önceki karma kullanılır"""
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        cached = self.state['hashes'].get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        self.state['hashes'][path] = [signature, h.hexdigest()]
+        return h.hexdigest()
+
+    def code_files(self, script, seen=None):
+        """Betik ve içe aktardığı yerel modüller (özyinelemeli)"""
+        seen = set() if seen is None else seen
+        path = os.path.join(CODE_DIR, script)
+        if path in seen or not os.path.exists(path):
+            return seen
+        seen.add(path)
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                self.code_files(name.split('.')[0] + '.py', seen)
+        return seen
+
+    def fingerprint(self, stage):
+        h = hashlib.sha256()
+        for path in sorted(self.code_files(stage.script)):
+            h.update(f"{os.path.basename(path)}:{self.file_hash(path)};".encode())
+        for path in stage.inputs:
+            h.update(f"{path}:{self.file_hash(path)};".encode())
+        h.update(json.dumps([stage.args, stage.params], sort_keys=True).encode())
+        return h.hexdigest()
+
+    def is_valid(self, stage, fingerprint):
+        """Parmak izi aynı ve çıktılar kaydedildiği gibi duruyorsa aşama güncel"""
+        record = self.state['stages'].get(stage.name)
+        if not record or record['fingerprint'] != fingerprint:
+            return False
+        return all(self.file_hash(path) == record['outputs'].get(path) for path in stage.outputs)
+
+    def save_state(self):
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1)
+        os.replace(tmp, self.state_file)
+
+    def plan(self, targets=None):
+        """Hedefler ve bağımlılıkları (hedef verilmezse varsayılan aşamalar)"""
+        targets = targets or [name for name, stage in self.stages.items() if stage.default]
+        selected = set()
+
+        def visit(name):
+            if name not in self.stages:
+                raise KeyError(f"Bilinmeyen aşama: {name}")
+            if name not in selected:
+                selected.add(name)
+                for dep in self.deps[name]:
+                    visit(dep)
+
+        for name in targets:
+            visit(name)
+        return [name for name in self.stages if name in selected]
+
+    def _run_stage(self, stage):
+        env = dict(os.environ, PYTHONIOENCODING='utf-8')
+        # Aşamalar ölçümleri aynı JSONL izine yazar; Prometheus ucu yalnızca bu süreçte açılır
+        env.pop('ECOHALT_METRICS_PORT', None)
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(CODE_DIR, stage.script), *stage.args],
+                                cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, encoding='utf-8')
+        return result, time.perf_counter() - start
+
+    def run(self, targets=None, force=(), dry_run=False):
+        names = self.plan(targets)
+        pending = set(names)
+        done, failed, will_run = set(), set(), set()
+        summary = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            running = {}
+            while pending or running:
+                # Bağımlılıkları tamamlanmış aşamaları başlat (ya da atla)
+                for name in [n for n in names if n in pending]:
+                    deps = self.deps[name]
+                    if any(d in failed for d in deps):
+                        pending.discard(name)
+                        failed.add(name)
+                        summary[name] = 'bağımlılık hatası'
+                        continue
+                    if not all(d in done for d in deps):
+                        continue
+                    pending.discard(name)
+                    stage = self.stages[name]
+                    stale = (name in force or any(d in will_run for d in deps)
+                             or not self.is_valid(stage, self.fingerprint(stage)))
+                    if not stale:
+                        metrics.count('pipeline_stage_skipped_total', stage=name)
+                        done.add(name)
+                        summary[name] = 'güncel, atlandı'
+                        continue
+                    will_run.add(name)
+                    if dry_run:
+                        done.add(name)
+                        summary[name] = 'çalıştırılacak'
+                        continue
+                    print(f"▶ {name} başladı ({stage.script})")
+                    running[executor.submit(self._run_stage, stage)] = name
+
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    stage = self.stages[name]
+                    result, elapsed = future.result()
+                    if result.stdout:
+                        print('\n'.join(f"[{name}] {line}" for line in result.stdout.splitlines()))
+                    metrics.observe('pipeline_stage_seconds', elapsed, stage=name)
+                    missing = [p for p in stage.outputs if not os.path.exists(p)]
+                    if result.returncode != 0 or missing:
+                        print(f"✖ {name} başarısız ({elapsed:.1f} sn)")
+                        if result.stderr:
+                            print('\n'.join(f"[{name}] {line}" for line in result.stderr.splitlines()[-20:]))
+                        if missing:
+                            print(f"[{name}] Eksik çıktılar: {missing}")
+                        failed.add(name)
+                        metrics.count('pipeline_stage_failures_total', stage=name)
+                        summary[name] = 'hata'
+                        continue
+                    # Parmak izi çalıştırma sonrası yeniden hesaplanır (girdiler değişmiş olabilir)
+                    self.state['stages'][name] = {
+                        'fingerprint': self.fingerprint(stage),
+                        'outputs': {p: self.file_hash(p) for p in stage.outputs},
+                        'seconds': round(elapsed, 2),
+                    }
+                    self.save_state()
+                    done.add(name)
+                    summary[name] = f"tamamlandı ({elapsed:.1f} sn)"
+                    print(f"✔ {name} tamamlandı ({elapsed:.1f} sn)")
+
+        if not dry_run:
+            self.save_state()
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EcoHalt Solar betik zincirini bağımlılık sırasıyla çalıştır")
+    parser.add_argument("targets", nargs="*", help="Çalıştırılacak aşamalar (bağımlılıklarıyla birlikte)")
+    parser.add_argument("--force", nargs="*", default=[], help="Güncel olsa bile yeniden çalıştırılacak aşamalar")
+    parser.add_argument("--jobs", type=int, default=None, help="Aynı anda çalışacak aşama sayısı")
+    parser.add_argument("--dry-run", action="store_true", help="Yalnızca hangi aşamaların çalışacağını göster")
+    parser.add_argument("--list", action="store_true", help="Aşamaları ve bağımlılıklarını listele")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(jobs=args.jobs)
+    if args.list:
+        for name, stage in pipeline.stages.items():
+            deps = ', '.join(pipeline.deps[name]) or '-'
+            print(f"{name:22s} {stage.script:28s} bağımlılıklar: {deps}")
+        return
+
+    summary = pipeline.run(args.targets, force=set(args.force), dry_run=args.dry_run)
+    print("\nÖzet:")
+    for name, status in summary.items():
+        print(f"  {name:22s} {status}")
+    if any(status in ('hata', 'bağımlılık hatası') for status in summary.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# PVGIS PVcalc uç noktası için ortak, eşzamanlı güneşlenme verisi çekici
+# Bağlantı havuzlu tek bir oturum + sınırlı iş parçacığı havuzu kullanır,
+# token-bucket hız sınırı uygular ve 429/5xx yanıtlarında yavaşlar.
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+PVGIS_URL = "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc"
+PVGIS_SERIES_URL = "https://re.jrc.ec.europa.eu/api/v5_2/seriescalc"
+
+# Tekrar denenecek HTTP durum kodları
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token-bucket hız sınırlayıcı (saniyede `rate` istek)"""
+
+    def __init__(self, rate=5.0, capacity=None, min_rate=0.2, increase=None):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        # Başarılı yanıt başına toplamsal artış (AIMD); varsayılan azami hızın %5'i
+        self.increase = float(increase or max(self.min_rate, self.max_rate * 0.05))
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # Bu zamana kadar gelen yeni yavaşlama istekleri aynı olayın parçası sayılır
+        self.backoff_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bir token alınana kadar bekle"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, window=None):
+        """
+        Sunucu yavaşlamamızı istedi: hızı yarıya indir ve kovayı boşalt.
+        Eşzamanlı işçilerden gelen 429/5xx yanıtları tek olay sayılır: yarılamadan
+        sonraki `window` saniye (varsayılan: yeni hızda bir istek aralığı, en az
+        yanıt süresi kadar) içindeki yavaşlama istekleri yok sayılır.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if now < self.backoff_until:
+                return
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.backoff_until = now + max(window or 0.0, 1.0 / self.rate)
+
+    def recover(self):
+        """Başarılı yanıtlardan sonra hızı toplamsal olarak eski değerine çıkar"""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+
+def annual_yield(data):
+    """PVcalc yanıtından yıllık E_y (kWh/yıl)"""
+    return data["outputs"]["totals"]["fixed"]["E_y"]
+
+
+class PVGISFetcher:
+    """PVGIS'ten yıllık E_y değerlerini eşzamanlı olarak çeken motor"""
+
+    def __init__(self, params=None, url=PVGIS_URL, max_workers=8, rate=5.0,
+                 max_retries=5, backoff_base=1.0, timeout=30, cache=None, extract=annual_yield):
+        self.params = dict(params or {})
+        # Yanıttan döndürülecek değer (varsayılan: E_y); seriescalc için saatlik seri
+        self.extract = extract
+        self.cache = cache
+        self.url = url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate)
+        self.stats = {"requests": 0, "retries": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+        # Havuz boyutu iş parçacığı sayısı kadar olmalı, yoksa bağlantılar atılır
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+        metrics.count(f"pvgis_{key}_total")
+
+    def _sleep_with_jitter(self, attempt, retry_after=None):
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self.backoff_base * (2 ** attempt)
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def fetch_one(self, lat, lon):
+        """Tek bir koordinat için yıllık E_y (kWh/yıl) döndür, hata olursa None"""
+        if self.cache is not None:
+            cached = self.cache.get(lat, lon, self.params)
+            if cached is not None:
+                return cached
+            value = self._request(lat, lon)
+            self.cache.put(lat, lon, self.params, value)
+            return value
+        return self._request(lat, lon)
+
+    @metrics.timed('pvgis_request')
+    def _request(self, lat, lon):
+        params = dict(self.params, lat=lat, lon=lon)
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            self._count("requests")
+            try:
+                sent = time.monotonic()
+                response = self.session.get(self.url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    print(f"Hata ({lat}, {lon}): {str(e)}")
+                    break
+                self._count("retries")
+                self._sleep_with_jitter(attempt)
+                continue
+
+            if response.status_code in RETRY_STATUS:
+                # Aynı anda uçuşta olan istekler bir yanıt süresi içinde döner
+                self.bucket.backoff(window=time.monotonic() - sent)
+                if attempt == self.max_retries:
+                    print(f"Hata ({lat}, {lon}): {response.status_code}")
+                    break
+                self._count("retries")
+                retry_after = response.headers.get("Retry-After")
+                try:
+                    retry_after = float(retry_after) if retry_after else None
+                except ValueError:
+                    retry_after = None
+                self._sleep_with_jitter(attempt, retry_after)
+                continue
+
+            try:
+                response.raise_for_status()
+                data = response.json()
+                self.bucket.recover()
+                return self.extract(data)
+            except Exception as e:
+                print(f"Hata ({lat}, {lon}): {str(e)}")
+                break
+
+        self._count("errors")
+        return None
+
+    def fetch_many(self, coords, verbose=True):
+        """(lat, lon) listesi için E_y değerlerini aynı sırada döndür"""
+        coords = list(coords)
+        if not coords:
+            return []
+
+        start = time.perf_counter()
+        results = [None] * len(coords)
+
+        # Önbellekte olanları ayır, yalnızca eksikleri API'den çek
+        pending = list(range(len(coords)))
+        if self.cache is not None:
+            pending = []
+            for i, (lat, lon) in enumerate(coords):
+                results[i] = self.cache.get(lat, lon, self.params)
+                if results[i] is None:
+                    pending.append(i)
+            if verbose:
+                print(f"Önbellekten {len(coords) - len(pending)} durak alındı, "
+                      f"{len(pending)} durak API'den çekilecek")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._request, *coords[i]): i
+                for i in pending
+            }
+            for done, future in enumerate(futures, 1):
+                results[futures[future]] = future.result()
+                if verbose and done % 100 == 0:
+                    print(f"{done}/{len(pending)} durak işlendi")
+
+        if self.cache is not None:
+            self.cache.put_many(
+                [(coords[i][0], coords[i][1], results[i]) for i in pending], self.params
+            )
+
+        elapsed = time.perf_counter() - start
+        self.stats["elapsed"] = elapsed
+        self.stats["stops_per_second"] = len(coords) / elapsed if elapsed > 0 else float("inf")
+        if verbose:
+            print(f"{len(coords)} durak {elapsed:.1f} sn'de işlendi "
+                  f"({self.stats['stops_per_second']:.1f} durak/sn, "
+                  f"{self.stats['retries']} tekrar, {self.stats['errors']} hata)")
+        return results
+
+    def close(self):
+        self.session.close()
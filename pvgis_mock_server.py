@@ -0,0 +1,81 @@
+# PVGIS PVcalc için yerel sahte HTTP sunucusu
+# pvgis_client'ı gerçek API'ye gitmeden test etmek ve durak/sn ölçmek için
+
+import argparse
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import time
+
+
+def fake_annual_yield(lat, lon):
+    """Enleme göre kabaca değişen deterministik bir E_y değeri üret"""
+    return round(1150 - (lat - 52.0) * 40 + (lon - 13.0) * 5, 2)
+
+
+def make_handler(latency=0.05, error_rate=0.0):
+    class PVGISHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            time.sleep(latency)
+
+            if random.random() < error_rate:
+                self.send_response(429)
+                self.send_header("Retry-After", "0.1")
+                self.end_headers()
+                return
+
+            try:
+                lat = float(query["lat"][0])
+                lon = float(query["lon"][0])
+            except (KeyError, ValueError):
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            body = json.dumps({
+                "inputs": {"location": {"latitude": lat, "longitude": lon}},
+                "outputs": {"totals": {"fixed": {"E_y": fake_annual_yield(lat, lon)}}}
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PVGISHandler
+
+
+def start_server(port=0, latency=0.05, error_rate=0.0):
+    """Sunucuyu arka planda başlat; (server, url) döndür"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency, error_rate))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v5_2/PVcalc"
+    return server, url
+
+
+if __name__ == "__main__":
+    from pvgis_client import PVGISFetcher
+
+    parser = argparse.ArgumentParser(description="Yerel PVGIS sunucusuna karşı çekici hızını ölç")
+    parser.add_argument("--stops", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=200.0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_server(latency=args.latency, error_rate=args.error_rate)
+    coords = [(random.uniform(52.3382, 52.6755), random.uniform(13.0883, 13.7611))
+              for _ in range(args.stops)]
+
+    fetcher = PVGISFetcher(url=url, max_workers=args.workers, rate=args.rate, backoff_base=0.05)
+    fetcher.fetch_many(coords)
+    fetcher.close()
+    server.shutdown()
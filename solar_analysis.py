@@ -1,63 +1,67 @@
-import requests
-import pandas as pd
-import time
 import os
+import threading
+import metrics
+from gtfs_loader import read_stops
+from pvgis_client import PVGISFetcher
+from irradiation_cache import IrradiationCache
+from storage import save_dataset
 
-def get_solar_irradiation(lat, lon):
+# PVGIS PVcalc parametreleri
+PVGIS_PARAMS = {
+    "peakpower": 1,
+    "loss": 0,
+    "outputformat": "json",
+    "browser": 1,
+    "angle": 35,  # sabit panel açısı örnek olarak
+    "optimalangles": 0,
+    "raddatabase": "PVGIS-SARAH2",
+    "usehorizon": 1,
+    "components": 1
+}
+
+# Tekil çağrılar için ortak çekici: oturum (bağlantı havuzu) ve hız sınırı paylaşılır
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+def default_fetcher():
+    """İlk kullanımda oluşturulan, süreç boyunca paylaşılan PVGISFetcher"""
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = PVGISFetcher(PVGIS_PARAMS)
+        return _default_fetcher
+
+@metrics.timed()
+def get_solar_irradiation(lat, lon, fetcher=None):
     """
     PVGIS API üzerinden yıllık GHI (Global Horizontal Irradiation) verisini çek
     """
-    url = "https://re.jrc.ec.europa.eu/api/v5_2/PVcalc"
-    params = {
-        "lat": lat,
-        "lon": lon,
-        "peakpower": 1,
-        "loss": 0,
-        "outputformat": "json",
-        "browser": 1,
-        "angle": 35,  # sabit panel açısı örnek olarak
-        "optimalangles": 0,
-        "raddatabase": "PVGIS-SARAH2",
-        "usehorizon": 1,
-        "components": 1
-    }
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        annual_irradiation = data["outputs"]["totals"]['fixed']['E_y']  # kWh/yıl
-        return annual_irradiation
-    except Exception as e:
-        print(f"Hata ({lat}, {lon}): {str(e)}")
-        return None
+    fetcher = fetcher or default_fetcher()
+    return fetcher.fetch_one(lat, lon)
 
-def process_stops_with_solar_data(input_file, output_file, sample_size=10):
+def process_stops_with_solar_data(input_file, output_file, sample_size=10, cache_file=None):
     """
     Durak verilerini oku ve güneşlenme verilerini ekle
     """
     print(f"Durak verisi okunuyor: {input_file}")
-    df = pd.read_csv(input_file)
+    df = read_stops(input_file)
     
-    # İlk N durak için güneşlenme verisi çek
+    # İlk N durak için güneşlenme verisi çek (eşzamanlı, hız sınırlı)
     print(f"İlk {sample_size} durak için güneşlenme verisi alınıyor...")
-    solar_values = []
-    
-    for i, row in df.head(sample_size).iterrows():
-        lat = row['stop_lat']
-        lon = row['stop_lon']
-        print(f"Durak {i+1}/{sample_size}: {row['stop_name']} ({lat}, {lon})")
-        
-        irradiation = get_solar_irradiation(lat, lon)
-        solar_values.append(irradiation)
-        
-        # API aşımını önlemek için gecikme
-        time.sleep(1.5)
+    sample = df.head(sample_size)
+    cache = IrradiationCache(cache_file) if cache_file else None
+    fetcher = PVGISFetcher(PVGIS_PARAMS, cache=cache)
+    solar_values = fetcher.fetch_many(zip(sample['stop_lat'], sample['stop_lon']))
+    fetcher.close()
+    if cache is not None:
+        print(f"Önbellek: {cache.stats()}")
+        cache.close()
     
     # Veriye sütun olarak ekle
-    df.loc[:sample_size-1, 'irradiation_kWh'] = solar_values
+    df.loc[sample.index, 'irradiation_kWh'] = solar_values
     
     # Sonuçları CSV'ye yaz
-    df.to_csv(output_file, index=False)
+    save_dataset(df, output_file)
     print(f"\nGüneşlenme verili durak dosyası kaydedildi: {output_file}")
     
     return df
@@ -67,9 +71,10 @@ if __name__ == "__main__":
     folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
     input_file = os.path.join(folder_path, "stops.txt")
     output_file = os.path.join(folder_path, "stops_with_irradiation.csv")
+    cache_file = os.path.join(folder_path, "pvgis_cache.sqlite")
     
     # İşlemi başlat
-    df = process_stops_with_solar_data(input_file, output_file, sample_size=10)
+    df = process_stops_with_solar_data(input_file, output_file, sample_size=10, cache_file=cache_file)
     
     # Sonuçları göster
     print("\nİlk 5 durak için güneşlenme verileri:")
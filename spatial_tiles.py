@@ -0,0 +1,101 @@
+# Harita görünüm alanına göre durak seçimi için çok çözünürlüklü uzamsal indeks
+# Düşük yakınlaştırmada duraklar kare hücrelerde toplanır (adet + ortalama),
+# yüksek yakınlaştırmada yalnızca görünüm alanındaki duraklar tek tek döndürülür.
+
+import numpy as np
+import pandas as pd
+
+
+def tile_coords(lat, lon, zoom):
+    """Web Mercator karo koordinatları (ondalıklı)"""
+    lat = np.radians(np.clip(np.asarray(lat, dtype=float), -85.0511, 85.0511))
+    n = 2.0 ** zoom
+    x = (np.asarray(lon, dtype=float) + 180.0) / 360.0 * n
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * n
+    return x, y
+
+
+class SpatialTileIndex:
+    """
+    Durakları bir kez karolara ayırır; her sorguda yalnızca görünüm
+    alanına düşen karolardaki duraklar incelenir.
+    """
+
+    def __init__(self, df, lat_col='stop_lat', lon_col='stop_lon',
+                 index_zoom=12, max_zoom=18, bin_offset=2):
+        self.lat = df[lat_col].to_numpy(dtype=float)
+        self.lon = df[lon_col].to_numpy(dtype=float)
+        self.index_zoom = index_zoom
+        self.max_zoom = max_zoom
+        # Toplama hücreleri bir karonun 1/2^bin_offset'i kadardır
+        self.bin_offset = bin_offset
+
+        # En ince çözünürlükte tamsayı karo koordinatları; daha kaba seviyeler
+        # bit kaydırma ile elde edilir
+        fine_zoom = max_zoom + bin_offset
+        x, y = tile_coords(self.lat, self.lon, fine_zoom)
+        self.fine_zoom = fine_zoom
+        self.fx = np.nan_to_num(x, nan=-1).astype(np.int64)
+        self.fy = np.nan_to_num(y, nan=-1).astype(np.int64)
+        valid = ~(np.isnan(self.lat) | np.isnan(self.lon))
+
+        # Görünüm alanı araması için index_zoom karolarına göre sıralı anahtarlar
+        shift = fine_zoom - index_zoom
+        keys = (self.fy >> shift) * (2 ** index_zoom) + (self.fx >> shift)
+        positions = np.flatnonzero(valid)
+        order = np.argsort(keys[positions], kind='stable')
+        self.sorted_positions = positions[order]
+        self.sorted_keys = keys[positions][order]
+
+    def _viewport_positions(self, bounds):
+        """Sınırlar içindeki durakların konumları"""
+        south, west, north, east = bounds
+        x0, y0 = tile_coords(north, west, self.index_zoom)
+        x1, y1 = tile_coords(south, east, self.index_zoom)
+        n = 2 ** self.index_zoom
+        x0, x1 = int(max(x0, 0)), int(min(x1, n - 1))
+        y0, y1 = int(max(y0, 0)), int(min(y1, n - 1))
+
+        # Her karo satırı sıralı anahtarlarda bitişik bir aralıktır
+        chunks = []
+        for ty in range(y0, y1 + 1):
+            start = np.searchsorted(self.sorted_keys, ty * n + x0, side='left')
+            end = np.searchsorted(self.sorted_keys, ty * n + x1, side='right')
+            chunks.append(self.sorted_positions[start:end])
+        candidates = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+        lat, lon = self.lat[candidates], self.lon[candidates]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return candidates[inside]
+
+    def query(self, bounds, zoom, positions=None, values=None, max_points=2000, detail_zoom=15):
+        """
+        bounds: (güney, batı, kuzey, doğu). positions: filtrelenmiş satırlar.
+        ('points', konumlar) ya da ('bins', hücre DataFrame'i) döndürür.
+        """
+        visible = self._viewport_positions(bounds)
+        if positions is not None:
+            visible = np.intersect1d(visible, positions, assume_unique=True)
+
+        if zoom >= detail_zoom or len(visible) <= max_points:
+            return 'points', visible
+
+        bin_zoom = min(int(zoom) + self.bin_offset, self.fine_zoom)
+        shift = self.fine_zoom - bin_zoom
+        codes = (self.fy[visible] >> shift) * (2 ** bin_zoom) + (self.fx[visible] >> shift)
+        cells, inverse = np.unique(codes, return_inverse=True)
+        counts = np.bincount(inverse)
+        bins = pd.DataFrame({
+            'stop_lat': np.bincount(inverse, weights=self.lat[visible]) / counts,
+            'stop_lon': np.bincount(inverse, weights=self.lon[visible]) / counts,
+            'count': counts,
+        })
+        if values is not None:
+            v = np.asarray(values, dtype=float)[visible]
+            # Eksik (NaN) değerler ortalamaya katılmaz; hiç geçerli değeri olmayan hücre NaN olur
+            valid = ~np.isnan(v)
+            valid_counts = np.bincount(inverse, weights=valid, minlength=len(cells))
+            sums = np.bincount(inverse, weights=np.where(valid, v, 0.0), minlength=len(cells))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                bins['value'] = np.where(valid_counts > 0, sums / valid_counts, np.nan)
+        return 'bins', bins
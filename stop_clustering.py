@@ -0,0 +1,52 @@
+# Birbirine çok yakın durakları (ör. aynı aktarma noktasındaki peronlar)
+# ızgara hücrelerinde birleştirerek PVGIS isteklerini tekilleştirme
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_M = 6371000.0
+
+# İzdüşüm için sabit referans enlemi (Berlin). Veriden hesaplansaydı durak
+# eklemek ızgarayı kaydırır ve önbellekteki tüm hücre anahtarlarını bozardı.
+REFERENCE_LAT = 52.5
+
+
+def cluster_stops(df, cell_size_m=50, lat_col='stop_lat', lon_col='stop_lon', ref_lat=REFERENCE_LAT):
+    """
+    Durakları cell_size_m boyutlu ızgaraya oturt.
+    (küme numaraları, küme temsilcileri DataFrame'i) döndürür.
+    Temsilci koordinat hücre merkezidir: durak eklemek ya da taşımak diğer
+    durakların PVGIS'e gönderilen koordinatını (ve önbellek anahtarını) değiştirmez.
+    Koordinatı eksik (NaN) duraklar hiçbir kümeye girmez, küme numaraları -1 olur.
+    """
+    lat = df[lat_col].to_numpy(dtype=float)
+    lon = df[lon_col].to_numpy(dtype=float)
+
+    # Yerel eşdikdörtgen izdüşüm (şehir ölçeğinde yeterli)
+    x_scale = EARTH_RADIUS_M * np.cos(np.radians(ref_lat))
+    y = np.radians(lat) * EARTH_RADIUS_M
+    x = np.radians(lon) * x_scale
+
+    # NaN koordinatlar tamsayıya çevrilince anlamsız ortak bir hücreye düşerdi
+    valid = np.isfinite(x) & np.isfinite(y)
+    cells = pd.DataFrame({
+        'cx': np.floor(x[valid] / cell_size_m).astype(np.int64),
+        'cy': np.floor(y[valid] / cell_size_m).astype(np.int64),
+    })
+    valid_ids = cells.groupby(['cx', 'cy'], sort=False).ngroup().to_numpy()
+    cluster_ids = np.full(len(df), -1, dtype=np.int64)
+    cluster_ids[valid] = valid_ids
+
+    # Temsilci: hücre merkezi (yuvarlama, kayan nokta gürültüsünü anahtardan uzak tutar)
+    representatives = (
+        cells.assign(cluster=valid_ids)
+        .groupby('cluster')
+        .agg(cx=('cx', 'first'), cy=('cy', 'first'), members=('cx', 'size'))
+    )
+    representatives[lat_col] = np.round(
+        np.degrees((representatives['cy'] + 0.5) * cell_size_m / EARTH_RADIUS_M), 6)
+    representatives[lon_col] = np.round(
+        np.degrees((representatives['cx'] + 0.5) * cell_size_m / x_scale), 6)
+    representatives = representatives[[lat_col, lon_col, 'members']]
+    return cluster_ids, representatives
+
@@ -0,0 +1,61 @@
+# Ara veri setleri için sütunlu (Parquet) depolama katmanı
+# Veri setleri tipli ve sıkıştırılmış Parquet olarak yazılır; okuyucular
+# yalnızca ihtiyaç duydukları sütunları bellek eşlemeli olarak yükler.
+# CSV dışa aktarımı isteğe bağlı olarak sürdürülür.
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import metrics
+
+
+def parquet_path(path):
+    """'x.csv' -> 'x.parquet'"""
+    base, ext = os.path.splitext(path)
+    return base + '.parquet' if ext != '.parquet' else path
+
+
+def csv_path(path):
+    """'x.parquet' -> 'x.csv'"""
+    base, ext = os.path.splitext(path)
+    return base + '.csv' if ext != '.csv' else path
+
+
+def _typed(df):
+    """Metin sütunlarını Arrow string tipine çevir (object yerine)"""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype('string')
+    return df
+
+
+@metrics.timed()
+def save_dataset(df, path, csv=True, compression='zstd'):
+    """Veri setini Parquet olarak (istenirse CSV olarak da) kaydet"""
+    if csv:
+        df.to_csv(csv_path(path), index=False)
+    # Parquet her zaman CSV'den sonra yazılır; okurken tazelik kontrolü buna dayanır
+    table = pa.Table.from_pandas(_typed(df), preserve_index=False)
+    pq.write_table(table, parquet_path(path), compression=compression)
+
+
+@metrics.timed()
+def load_dataset(path, columns=None):
+    """
+    Veri setini yükle. Güncel bir Parquet kopyası varsa yalnızca istenen
+    sütunları bellek eşlemeli olarak okur, yoksa CSV'ye geri döner.
+    """
+    pq_file = parquet_path(path)
+    csv_file = csv_path(path)
+    has_parquet = os.path.exists(pq_file)
+    has_csv = os.path.exists(csv_file)
+
+    # CSV elle güncellendiyse (Parquet'ten yeniyse) CSV'yi kullan
+    if has_parquet and (not has_csv or os.path.getmtime(pq_file) >= os.path.getmtime(csv_file)):
+        table = pq.read_table(pq_file, columns=columns, memory_map=True)
+        return table.to_pandas()
+    return pd.read_csv(csv_file, usecols=columns)
@@ -4,14 +4,20 @@
 import pandas as pd
 import os
 from sklearn.preprocessing import MinMaxScaler
+from storage import load_dataset, save_dataset
+from metro_distance import compute_metro_distance
+from top_k import top_k, DEFAULT_MIN_SEPARATION_M
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
 input_file = os.path.join(folder_path, "stops_with_irradiation.csv")
 output_file = os.path.join(folder_path, "scored_solar_stops.csv")
 
+# Bu uzaklıktan (metre) yakın duraklar metroya yakın sayılır
+metro_radius_m = 400
+
 # Veriyi oku
-df = pd.read_csv(input_file)
+df = load_dataset(input_file)
 
 # Eksik verileri temizle
 df = df[pd.notnull(df['irradiation_kWh'])]
@@ -21,8 +27,9 @@ df['irradiation_kWh'] = pd.to_numeric(df['irradiation_kWh'], errors='coerce')
 scaler = MinMaxScaler()
 df['irradiation_score'] = scaler.fit_transform(df[['irradiation_kWh']])
 
-# Özellik 2: Metroya yakınlık (adı "U " ile başlayan duraklar)
-df['is_metro'] = df['stop_name'].str.contains("U ", case=False, na=False).astype(int)
+# Özellik 2: Metroya yakınlık (en yakın U-/S-Bahn istasyonuna gerçek uzaklık)
+df['metro_distance'] = compute_metro_distance(df, folder_path)
+df['is_metro'] = (df['metro_distance'] <= metro_radius_m).astype(int)
 
 # Özellik 3: Zentrum içeren adlar (merkez)
 df['is_zentrum'] = df['stop_name'].str.contains("Zentrum", case=False, na=False).astype(int)
@@ -34,10 +41,10 @@ df['suitability_score'] = (
     0.1 * df['is_zentrum']
 )
 
-# Skora göre sırala ve ilk 10 durağı al
-top10_scored = df.sort_values(by='suitability_score', ascending=False).head(10)
+# Skoru en yüksek 10 farklı yeri al (tam sıralama yerine kısmi seçim)
+top10_scored = df.iloc[top_k(df, 10, 'suitability_score', DEFAULT_MIN_SEPARATION_M)]
 
-top10_scored.to_csv(output_file, index=False)
+save_dataset(top10_scored, output_file)
 
 print("Uygunluk skoruna göre en iyi 10 durak:")
 print(top10_scored[['stop_name', 'irradiation_kWh', 'is_metro', 'is_zentrum', 'suitability_score']])
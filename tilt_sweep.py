@@ -0,0 +1,133 @@
+# Durak başına panel eğim/yön taraması
+# Işınım bileşenleri her durak için bir kez (yerel modelle) hesaplanır;
+# tüm eğim x yön ızgarası tek bir matris çarpımıyla değerlendirilir.
+# API çağrısı yapılmaz, maliyet durak x açı sayısıyla değil durak sayısıyla ölçeklenir.
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from clearsky_model import irradiance_components
+
+DEFAULT_TILTS = np.arange(0, 65, 5)
+# Pusula yönü: 90 = doğu, 180 = güney, 270 = batı
+DEFAULT_AZIMUTHS = np.arange(90, 285, 15)
+
+
+def _load_components(lat, lon, cache_dir=None, **kwargs):
+    """Bileşenleri hesapla; cache_dir verilirse koordinat karmasıyla diskte sakla"""
+    cache_file = None
+    if cache_dir:
+        key = hashlib.sha256(np.round(np.stack([lat, lon]), 6).tobytes() +
+                             repr(sorted(kwargs.items())).encode()).hexdigest()[:20]
+        cache_file = os.path.join(cache_dir, f"components_{key}.npz")
+        if os.path.exists(cache_file):
+            data = np.load(cache_file)
+            return {name: data[name] for name in data.files}
+
+    c = irradiance_components(lat, lon, **kwargs)
+    zen = np.radians(c['zenith'])
+    az = np.radians(c['azimuth'])
+    # cos(AOI) = cos z cos b + sin b (sin z cos az_s cos az_p + sin z sin az_s sin az_p)
+    components = {
+        'a': np.cos(zen).astype(np.float32),
+        'b': (np.sin(zen) * np.cos(az)).astype(np.float32),
+        'c': (np.sin(zen) * np.sin(az)).astype(np.float32),
+        'dni': c['dni'].astype(np.float32),
+        'dhi_sum': c['dhi'].sum(axis=1),
+        'ghi_sum': c['ghi'].sum(axis=1),
+    }
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(cache_file, **components)
+    return components
+
+
+def _grid_yield(components, tilts, azimuths, albedo=0.2, config_chunk=64):
+    """(durak, yapılandırma) boyutlu yıllık ışınım toplamları, Wh/m2"""
+    tilt, azimuth = np.meshgrid(np.radians(tilts), np.radians(azimuths), indexing='ij')
+    tilt, azimuth = tilt.ravel(), azimuth.ravel()
+    coeffs = np.stack([np.cos(tilt),
+                       np.sin(tilt) * np.cos(azimuth),
+                       np.sin(tilt) * np.sin(azimuth)]).astype(np.float32)
+
+    abc = np.stack([components['a'], components['b'], components['c']], axis=-1)
+    beam = np.empty((abc.shape[0], len(tilt)))
+    for start in range(0, len(tilt), config_chunk):
+        cos_aoi = abc @ coeffs[:, start:start + config_chunk]
+        np.clip(cos_aoi, 0, None, out=cos_aoi)
+        beam[:, start:start + config_chunk] = np.einsum('sh,shc->sc', components['dni'], cos_aoi)
+
+    sky = components['dhi_sum'][:, None] * (1 + np.cos(tilt))[None, :] / 2
+    ground = components['ghi_sum'][:, None] * albedo * (1 - np.cos(tilt))[None, :] / 2
+    return beam + sky + ground
+
+
+def sweep(df, tilts=DEFAULT_TILTS, azimuths=DEFAULT_AZIMUTHS, actual_tilt=None, actual_azimuth=None,
+          loss=14.0, albedo=0.2, chunk_size=64, cache_dir=None, lat_col='stop_lat', lon_col='stop_lon', **kwargs):
+    """
+    Her durak için en iyi eğim/yönü ve gerçek çatı yönündeki verim kaybını bul.
+    actual_tilt / actual_azimuth: sabit değer ya da durak başına dizi (sütun).
+    """
+    tilts = np.asarray(tilts, dtype=float)
+    azimuths = np.asarray(azimuths, dtype=float)
+    lat = df[lat_col].to_numpy(dtype=float)
+    lon = df[lon_col].to_numpy(dtype=float)
+    n = len(df)
+    actual_tilt = np.broadcast_to(np.asarray(actual_tilt if actual_tilt is not None else 0, dtype=float), (n,))
+    actual_azimuth = np.broadcast_to(np.asarray(actual_azimuth if actual_azimuth is not None else 180, dtype=float), (n,))
+    factor = (1 - loss / 100) / 1000
+
+    out = pd.DataFrame(index=df.index, columns=['opt_tilt', 'opt_azimuth', 'opt_yield_kWh',
+                                                'actual_yield_kWh', 'yield_loss_pct'], dtype=float)
+    valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon)))
+    for start in range(0, len(valid), chunk_size):
+        idx = valid[start:start + chunk_size]
+        components = _load_components(lat[idx], lon[idx], cache_dir, **kwargs)
+
+        totals = _grid_yield(components, tilts, azimuths, albedo) * factor
+        best = totals.argmax(axis=1)
+        best_tilt = tilts[best // len(azimuths)]
+        best_azimuth = azimuths[best % len(azimuths)]
+
+        # Gerçek yön için aynı bileşenlerle tam hesap (durak başına farklı olabilir)
+        t = np.radians(actual_tilt[idx])[:, None]
+        g = np.radians(actual_azimuth[idx])[:, None]
+        cos_aoi = components['a'] * np.cos(t) + np.sin(t) * (components['b'] * np.cos(g) + components['c'] * np.sin(g))
+        actual = ((components['dni'] * np.clip(cos_aoi, 0, None)).sum(axis=1)
+                  + components['dhi_sum'] * (1 + np.cos(t[:, 0])) / 2
+                  + components['ghi_sum'] * albedo * (1 - np.cos(t[:, 0])) / 2) * factor
+
+        rows = df.index[idx]
+        out.loc[rows, 'opt_tilt'] = best_tilt
+        out.loc[rows, 'opt_azimuth'] = best_azimuth
+        out.loc[rows, 'opt_yield_kWh'] = totals.max(axis=1)
+        out.loc[rows, 'actual_yield_kWh'] = actual
+        out.loc[rows, 'yield_loss_pct'] = (1 - actual / totals.max(axis=1)) * 100
+    return out
+
+
+if __name__ == "__main__":
+    from storage import load_dataset, save_dataset
+
+    folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
+    parser = argparse.ArgumentParser(description="Durak başına panel eğim/yön taraması")
+    parser.add_argument("--input", default=os.path.join(folder_path, "bus_tram_stops_with_irradiation.csv"))
+    parser.add_argument("--output", default=os.path.join(folder_path, "tilt_sweep_results.csv"))
+    parser.add_argument("--shelter-tilt", type=float, default=5.0, help="Durak çatısının eğimi (derece)")
+    parser.add_argument("--shelter-azimuth", type=float, default=180.0, help="Çatı yönü (pusula, 180 = güney)")
+    parser.add_argument("--cache-dir", default=os.path.join(folder_path, "irradiance_components"))
+    args = parser.parse_args()
+
+    df = load_dataset(args.input)
+    results = sweep(df, actual_tilt=args.shelter_tilt, actual_azimuth=args.shelter_azimuth,
+                    cache_dir=args.cache_dir)
+    df = pd.concat([df, results], axis=1)
+    save_dataset(df, args.output)
+    print(f"{len(df)} durak tarandı; ortalama verim kaybı: {results['yield_loss_pct'].mean():.1f}%")
+    print(f"En sık en iyi eğim: {results['opt_tilt'].mode().iloc[0]:.0f}°, "
+          f"yön: {results['opt_azimuth'].mode().iloc[0]:.0f}°")
+    print(f"Sonuçlar kaydedildi: {args.output}")
@@ -3,6 +3,8 @@
 
 import pandas as pd
 import os
+from storage import load_dataset, save_dataset
+from top_k import top_k, DEFAULT_MIN_SEPARATION_M
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
@@ -10,18 +12,18 @@ input_file = os.path.join(folder_path, "stops_with_irradiation.csv")
 output_file = os.path.join(folder_path, "top10_solar_stops.csv")
 
 # Veriyi yükle
-df = pd.read_csv(input_file)
+df = load_dataset(input_file)
 
 # Geçerli irradiation verisi olanları filtrele
 df = df[pd.notnull(df['irradiation_kWh'])]
 df['irradiation_kWh'] = pd.to_numeric(df['irradiation_kWh'], errors='coerce')
 
-# En yüksek 10 güneşlenme potansiyelli durağı seç
-sorted_df = df.sort_values(by='irradiation_kWh', ascending=False)
-top10 = sorted_df.head(10)
+# En yüksek 10 güneşlenme potansiyelli durağı seç (kısmi seçim, aynı kavşaktaki
+# peronlar yerine birbirinden uzak farklı yerler)
+top10 = df.iloc[top_k(df, 10, 'irradiation_kWh', DEFAULT_MIN_SEPARATION_M)]
 
 # Seçilen veriyi kaydet
-top10.to_csv(output_file, index=False)
+save_dataset(top10, output_file)
 
 # Bilgilendir
 print("En uygun 10 durak:")
@@ -0,0 +1,139 @@
+# En iyi k durak seçimi
+# - top_k: tek seferlik sorgular için kısmi seçim (argpartition, O(n))
+# - TopKIndex: skor sırası bir kez hesaplanır; tekrar eden dashboard sorguları
+#   sıralı listenin yalnızca başını dolaşır
+# Minimum uzaklık kısıtı: aynı aktarma noktasındaki peronlar yerine birbirinden
+# en az min_separation_m uzak, farklı yerler seçilir (ızgara ile O(1) komşu kontrolü).
+
+import numpy as np
+
+# Aynı kavşaktaki peronları tek bir yer saymak için varsayılan uzaklık (metre)
+DEFAULT_MIN_SEPARATION_M = 150
+
+M_PER_DEG_LAT = 110540.0
+M_PER_DEG_LON = 111320.0
+
+
+def _planar(lat, lon):
+    """Kısa mesafeler için eşdikdörtgen izdüşüm (metre)"""
+    lat0 = np.radians(np.nanmean(lat)) if len(lat) and not np.isnan(lat).all() else 0.0
+    return lon * M_PER_DEG_LON * np.cos(lat0), lat * M_PER_DEG_LAT
+
+
+class _SeparationGrid:
+    """Seçilen noktaları ızgarada tutar; yeni noktanın komşu hücrelerine bakar"""
+
+    def __init__(self, x, y, min_separation_m):
+        self.x, self.y = x, y
+        self.cell = float(min_separation_m)
+        self.limit = min_separation_m ** 2
+        self.grid = {}
+
+    def add(self, pos):
+        """Nokta seçilenlere yeterince uzaksa ekle ve True döndür"""
+        x, y = self.x[pos], self.y[pos]
+        if np.isnan(x) or np.isnan(y):
+            return False
+        cx, cy = int(x // self.cell), int(y // self.cell)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for other in self.grid.get((gx, gy), ()):
+                    if (x - self.x[other]) ** 2 + (y - self.y[other]) ** 2 < self.limit:
+                        return False
+        self.grid.setdefault((cx, cy), []).append(pos)
+        return True
+
+
+def _greedy_separated(candidates, x, y, k, min_separation_m):
+    """Skor sırasıyla gelen adaylardan, seçilenlere yeterince uzak olanları al"""
+    if not min_separation_m:
+        return list(candidates[:k])
+    grid = _SeparationGrid(x, y, min_separation_m)
+    chosen = []
+    for pos in candidates:
+        if grid.add(pos):
+            chosen.append(pos)
+            if len(chosen) == k:
+                break
+    return chosen
+
+
+def top_k(df, k, score_col, min_separation_m=0, lat_col='stop_lat', lon_col='stop_lon'):
+    """
+    df içinde skoru en yüksek k satırın konumları (azalan sırada).
+    Tam sıralama yerine argpartition ile aday havuzu seçilir; uzaklık kısıtı
+    yüzünden havuz yetmezse havuz büyütülür.
+    """
+    scores = df[score_col].to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(scores))
+    if min_separation_m:
+        x, y = _planar(df[lat_col].to_numpy(dtype=float), df[lon_col].to_numpy(dtype=float))
+    else:
+        x = y = None
+
+    pool = k if not min_separation_m else 4 * k
+    while True:
+        pool = min(pool, len(valid))
+        if pool < len(valid):
+            part = valid[np.argpartition(-scores[valid], pool - 1)[:pool]]
+        else:
+            part = valid
+        candidates = part[np.argsort(-scores[part], kind='stable')]
+        chosen = _greedy_separated(candidates, x, y, k, min_separation_m)
+        if len(chosen) == k or pool == len(valid):
+            return np.array(chosen, dtype=np.int64)
+        pool *= 4
+
+
+class TopKIndex:
+    """Tekrarlanan top-k sorguları için önceden sıralanmış indeks"""
+
+    def __init__(self, df, score_col, min_separation_m=DEFAULT_MIN_SEPARATION_M, group_col=None,
+                 lat_col='stop_lat', lon_col='stop_lon'):
+        self.size = len(df)
+        self.min_separation_m = min_separation_m
+        scores = df[score_col].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(scores))
+        self.order = valid[np.argsort(-scores[valid], kind='stable')]
+        self.x, self.y = _planar(df[lat_col].to_numpy(dtype=float), df[lon_col].to_numpy(dtype=float))
+
+        # Grup (ör. ilçe) başına skor sırası
+        self.group_order = {}
+        if group_col is not None:
+            groups = df[group_col].to_numpy()[self.order]
+            for group in np.unique(groups[~df[group_col].isna().to_numpy()[self.order]]):
+                self.group_order[group] = self.order[groups == group]
+        self._cache = {}
+
+    def query(self, k, positions=None, group=None, min_separation_m=None):
+        """
+        En iyi k konum. positions: filtreden geçen satırlar (ör. FilterIndex sonucu),
+        group: yalnızca o grubun durakları.
+        """
+        sep = self.min_separation_m if min_separation_m is None else min_separation_m
+        order = self.order if group is None else self.group_order.get(group, self.order[:0])
+        if positions is None:
+            key = (k, group, sep)
+            if key not in self._cache:
+                self._cache[key] = np.array(_greedy_separated(order, self.x, self.y, k, sep), dtype=np.int64)
+            return self._cache[key]
+
+        # Filtre maskesi: sıralı liste bloklar halinde, yalnızca k seçilene kadar dolaşılır
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        grid = _SeparationGrid(self.x, self.y, sep) if sep else None
+        chosen = []
+        step = max(4 * k, 256)
+        for start in range(0, len(order), step):
+            block = order[start:start + step]
+            for pos in block[mask[block]]:
+                if grid is None or grid.add(pos):
+                    chosen.append(pos)
+                    if len(chosen) == k:
+                        return np.array(chosen, dtype=np.int64)
+        return np.array(chosen, dtype=np.int64)
+
+    def per_group(self, k, min_separation_m=None):
+        """Her grup için en iyi k konum: {grup: konumlar}"""
+        return {group: self.query(k, group=group, min_separation_m=min_separation_m)
+                for group in self.group_order}
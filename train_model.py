@@ -6,6 +6,8 @@ from sklearn.preprocessing import MinMaxScaler
 import os
 import joblib
 import numpy as np
+from storage import load_dataset
+from compiled_forest import compile_forest, save_compiled
 
 def load_and_prepare_data():
     """Verileri yükle ve hazırla"""
@@ -14,7 +16,9 @@ def load_and_prepare_data():
     input_file = os.path.join(folder_path, "enhanced_solar_analysis.csv")
     
     # Veriyi oku
-    df = pd.read_csv(input_file)
+    df = load_dataset(input_file, columns=[
+        'irradiation_kWh', 'passenger_density', 'metro_distance', 'suitability_score'
+    ])
     
     # Etiket oluştur (en uygun %20 durak = 1, diğerleri = 0)
     threshold = df['suitability_score'].quantile(0.80)
@@ -88,9 +92,14 @@ def save_model(model, scaler, features):
     with open(features_path, 'w') as f:
         f.write('\n'.join(features))
     
+    # Scaler'ı eşiklere gömülmüş, düz dizili model (app.py için hızlı tahmin)
+    compiled_path = os.path.join(folder_path, "solar_stop_model_compiled.npz")
+    save_compiled(compile_forest(model, scaler, features), compiled_path)
+    
     print(f"\n✅ Model kaydedildi: {model_path}")
     print(f"✅ Scaler kaydedildi: {scaler_path}")
     print(f"✅ Özellik listesi kaydedildi: {features_path}")
+    print(f"✅ Derlenmiş model kaydedildi: {compiled_path}")
 
 def predict_new_stops(model, scaler, features):
     """Yeni duraklar için tahmin yap"""
@@ -0,0 +1,103 @@
+# Yerel bina ve yüzey modeli verisinden kentsel özellikler
+# - building_density: durak çevresindeki (yarıçap) alanın binalarla kaplı oranı
+#   (bina taban alanları + STRtree, tüm duraklar için tek toplu sorgu; üst üste
+#   binen taban alanları durak başına birleştirilir, çakışan alan iki kez sayılmaz)
+# - shading_factor: 1 - gökyüzü görüş faktörü; DSM rasterından her yönde
+#   ufuk açısı hesaplanır (pencereli okuma, duraklar karolar halinde işlenir)
+# geopandas/shapely/rasterio yalnızca bu özellikler hesaplanırken gereklidir.
+
+import numpy as np
+
+# Berlin için metrik projeksiyon (ETRS89 / UTM 33N)
+METRIC_CRS = "EPSG:25833"
+
+
+def _stop_points(df, crs, lat_col='stop_lat', lon_col='stop_lon'):
+    """Durak koordinatlarını verilen projeksiyona (x, y dizileri) çevir"""
+    import geopandas as gpd
+
+    points = gpd.GeoSeries(gpd.points_from_xy(df[lon_col], df[lat_col]), crs="EPSG:4326")
+    points = points.to_crs(crs)
+    return points.x.to_numpy(), points.y.to_numpy()
+
+
+def building_density(df, footprint_file, radius_m=100, lat_col='stop_lat', lon_col='stop_lon'):
+    """Her durak için yarıçap içindeki bina taban alanı oranı (0-1)"""
+    import geopandas as gpd
+    import shapely
+    from shapely import STRtree
+
+    buildings = gpd.read_file(footprint_file).to_crs(METRIC_CRS)
+    geoms = buildings.geometry.to_numpy()
+    tree = STRtree(geoms)
+
+    x, y = _stop_points(df, METRIC_CRS, lat_col, lon_col)
+    buffers = shapely.buffer(shapely.points(x, y), radius_m)
+
+    # Tüm durak tamponları için kesişen binalar tek sorguda bulunur
+    stop_idx, building_idx = tree.query(buffers, predicate='intersects')
+    pieces = gpd.GeoDataFrame({'stop': stop_idx},
+                              geometry=shapely.intersection(buffers[stop_idx], geoms[building_idx]),
+                              crs=METRIC_CRS)
+    # Aynı duraktaki parçalar birleştirilir (yinelenen/çakışan binalar tek sayılır)
+    merged = pieces.dissolve(by='stop')
+    covered = np.zeros(len(df))
+    covered[merged.index.to_numpy(dtype=int)] = merged.geometry.area.to_numpy()
+    density = covered / (np.pi * radius_m ** 2)
+    density[np.isnan(x) | np.isnan(y)] = np.nan
+    return np.clip(density, 0, 1)
+
+
+def shading_factor(df, dsm_file, max_distance_m=100, n_directions=16, step_m=5,
+                   observer_height_m=3.0, tile_size_m=1000, lat_col='stop_lat', lon_col='stop_lon'):
+    """
+    DSM rasterından gölgelenme faktörü: 1 - gökyüzü görüş faktörü (0 = açık, 1 = kapalı).
+    Panel durak çatısı yüksekliğinde (observer_height_m) varsayılır.
+    """
+    import rasterio
+    from rasterio.windows import from_bounds
+
+    result = np.full(len(df), np.nan)
+    azimuths = np.linspace(0, 2 * np.pi, n_directions, endpoint=False)
+    distances = np.arange(step_m, max_distance_m + step_m, step_m, dtype=float)
+    # (yön, mesafe) örnek noktalarının duraktan göreli konumları
+    dx = np.sin(azimuths)[:, None] * distances[None, :]
+    dy = np.cos(azimuths)[:, None] * distances[None, :]
+
+    with rasterio.open(dsm_file) as src:
+        x, y = _stop_points(df, src.crs, lat_col, lon_col)
+        valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+
+        # Durakları karolara ayır; her karo için tek pencere okunur
+        tile_xy = np.stack([x[valid] // tile_size_m, y[valid] // tile_size_m], axis=1).astype(int)
+        tile_keys, tile_of = np.unique(tile_xy, axis=0, return_inverse=True)
+        order = np.argsort(tile_of.ravel(), kind='stable')
+        groups = np.split(valid[order], np.cumsum(np.bincount(tile_of.ravel()))[:-1])
+
+        for (tx, ty), members in zip(tile_keys, groups):
+            pad = max_distance_m + step_m
+            window = from_bounds(tx * tile_size_m - pad, ty * tile_size_m - pad,
+                                 (tx + 1) * tile_size_m + pad, (ty + 1) * tile_size_m + pad,
+                                 transform=src.transform).round_offsets().round_lengths()
+            heights = src.read(1, window=window, boundless=True, fill_value=np.nan,
+                               masked=False).astype(float)
+            if src.nodata is not None:
+                heights[heights == src.nodata] = np.nan
+            inverse = ~src.window_transform(window)
+
+            def sample(px, py):
+                col, row = inverse * (px, py)
+                row = np.clip(np.floor(row).astype(int), 0, heights.shape[0] - 1)
+                col = np.clip(np.floor(col).astype(int), 0, heights.shape[1] - 1)
+                return heights[row, col]
+
+            sx, sy = x[members], y[members]
+            ground = sample(sx, sy) + observer_height_m
+            # (durak, yön, mesafe) boyutlu örnek yükseklikleri
+            ray_heights = sample(sx[:, None, None] + dx[None], sy[:, None, None] + dy[None])
+            elevation = np.arctan2(ray_heights - ground[:, None, None], distances[None, None, :])
+            horizon = np.clip(np.nan_to_num(elevation, nan=0.0).max(axis=2), 0, None)
+            sky_view = 1 - (np.sin(horizon) ** 2).mean(axis=1)
+            result[members] = 1 - sky_view
+
+    return result
@@ -3,6 +3,8 @@ import folium
 import os
 import webbrowser
 from branca.colormap import linear
+from map_layers import add_stop_layer
+from storage import load_dataset
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
@@ -10,7 +12,7 @@ input_file = os.path.join(folder_path, "scored_solar_stops.csv")
 output_file = os.path.join(folder_path, "scored_stops_map.html")
 
 # Veriyi oku
-df = pd.read_csv(input_file)
+df = load_dataset(input_file)
 
 # Harita merkezi: Berlin
 map_center = [52.5200, 13.4050]
@@ -23,25 +25,17 @@ colormap = linear.YlOrRd_09.scale(min_score, max_score)
 colormap.caption = 'Uygunluk Puanı'
 
 # Durakları haritaya ekle
-for _, row in df.iterrows():
-    score = row['suitability_score']
-    popup_text = f"""
-    <b>{row['stop_name']}</b><br>
-    Güneşlenme: {row['irradiation_kWh']:.1f} kWh/yıl<br>
-    Metro: {'Evet' if row['is_metro'] == 1 else 'Hayır'}<br>
-    Merkez: {'Evet' if row['is_zentrum'] == 1 else 'Hayır'}<br>
-    Uygunluk Puanı: {score:.3f}
-    """
-    
-    folium.CircleMarker(
-        location=[row['stop_lat'], row['stop_lon']],
-        radius=8,
-        color=colormap(score),
-        fill=True,
-        fill_color=colormap(score),
-        fill_opacity=0.7,
-        popup=folium.Popup(popup_text, max_width=300)
-    ).add_to(map_berlin)
+df['metro_text'] = df['is_metro'].map({1: 'Evet'}).fillna('Hayır')
+df['zentrum_text'] = df['is_zentrum'].map({1: 'Evet'}).fillna('Hayır')
+add_stop_layer(
+    map_berlin, df, df['suitability_score'], colormap, radius=8,
+    popup_fields=[
+        ('Güneşlenme', 'irradiation_kWh', 1, ' kWh/yıl'),
+        ('Metro', 'metro_text', None, ''),
+        ('Merkez', 'zentrum_text', None, ''),
+        ('Uygunluk Puanı', 'suitability_score', 3, ''),
+    ]
+)
 
 # Renk skalasını haritaya ekle
 colormap.add_to(map_berlin)
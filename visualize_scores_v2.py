@@ -4,6 +4,8 @@ import pandas as pd
 import folium
 import os
 from branca.colormap import linear
+from map_layers import add_stop_layer
+from storage import load_dataset
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
@@ -11,7 +13,7 @@ input_file = os.path.join(folder_path, "scored_solar_stops.csv")
 output_file = os.path.join(folder_path, "scored_stops_map.html")
 
 # Veriyi yükle
-df = pd.read_csv(input_file)
+df = load_dataset(input_file)
 
 # Harita oluştur
 map_center = [52.5200, 13.4050]  # Berlin
@@ -22,21 +24,10 @@ colormap = linear.YlGnBu_09.scale(df['suitability_score'].min(), df['suitability
 colormap.caption = 'Uygunluk Skoru'
 
 # Noktaları haritaya ekle
-for _, row in df.iterrows():
-    lat = row['stop_lat']
-    lon = row['stop_lon']
-    score = row['suitability_score']
-    name = row['stop_name']
-
-    folium.CircleMarker(
-        location=[lat, lon],
-        radius=5,
-        color=colormap(score),
-        fill=True,
-        fill_color=colormap(score),
-        fill_opacity=0.8,
-        popup=f"{name}<br>Skor: {score:.2f}"
-    ).add_to(m)
+add_stop_layer(
+    m, df, df['suitability_score'], colormap, radius=5, fill_opacity=0.8,
+    popup_fields=[('Skor', 'suitability_score', 2, '')]
+)
 
 # Renk barını haritaya ekle
 colormap.add_to(m)
@@ -4,6 +4,8 @@ import pandas as pd
 import folium
 import os
 from branca.colormap import linear
+from map_layers import add_stop_layer
+from storage import load_dataset
 
 # Dosya yolu
 folder_path = r"D:\Masaüstü\EcoHalt Solar\GTFS"
@@ -11,7 +13,7 @@ input_file = os.path.join(folder_path, "scored_solar_stops.csv")
 output_file = os.path.join(folder_path, "scored_stops_map_enhanced.html")
 
 # Veriyi yükle
-df = pd.read_csv(input_file)
+df = load_dataset(input_file)
 
 # Harita oluştur
 map_center = [52.5200, 13.4050]  # Berlin
@@ -22,42 +24,25 @@ colormap = linear.YlGnBu_09.scale(df['suitability_score'].min(), df['suitability
 colormap.caption = 'Uygunluk Skoru'
 
 # Noktaları haritaya ekle
-for _, row in df.iterrows():
-    lat = row['stop_lat']
-    lon = row['stop_lon']
-    score = row['suitability_score']
-    name = row['stop_name']
-    irradiation = row['irradiation_kWh']
-    is_metro = row['is_metro']
-    is_zentrum = row['is_zentrum']
-
-    # Detaylı popup içeriği
-    popup_text = f"""
-    <div style='font-family: Arial; font-size: 12px;'>
-        <h4 style='margin: 0 0 5px 0;'>{name}</h4>
-        <hr style='margin: 5px 0;'>
-        <b>Uygunluk Skoru:</b> {score:.3f}<br>
-        <b>Güneşlenme:</b> {irradiation:.1f} kWh/yıl<br>
-        <b>Metro:</b> {'✓' if is_metro == 1 else '✗'}<br>
-        <b>Merkez:</b> {'✓' if is_zentrum == 1 else '✗'}<br>
-        <hr style='margin: 5px 0;'>
-        <small>Koordinatlar: {lat:.6f}, {lon:.6f}</small>
-    </div>
-    """
-
-    # Nokta boyutunu skora göre ayarla (5-10 arası)
-    radius = 5 + (score * 5)
-
-    folium.CircleMarker(
-        location=[lat, lon],
-        radius=radius,
-        color=colormap(score),
-        fill=True,
-        fill_color=colormap(score),
-        fill_opacity=0.8,
-        popup=folium.Popup(popup_text, max_width=300),
-        tooltip=f"{name} (Skor: {score:.2f})"
-    ).add_to(m)
+df['metro_text'] = df['is_metro'].map({1: '✓'}).fillna('✗')
+df['zentrum_text'] = df['is_zentrum'].map({1: '✓'}).fillna('✗')
+df['coords_text'] = df['stop_lat'].map('{:.6f}'.format) + ', ' + df['stop_lon'].map('{:.6f}'.format)
+tooltips = df['stop_name'] + ' (Skor: ' + df['suitability_score'].map('{:.2f}'.format) + ')'
+
+# Nokta boyutunu skora göre ayarla (5-10 arası)
+radius = 5 + (df['suitability_score'] * 5)
+
+add_stop_layer(
+    m, df, df['suitability_score'], colormap, radius=radius, fill_opacity=0.8,
+    popup_fields=[
+        ('Uygunluk Skoru', 'suitability_score', 3, ''),
+        ('Güneşlenme', 'irradiation_kWh', 1, ' kWh/yıl'),
+        ('Metro', 'metro_text', None, ''),
+        ('Merkez', 'zentrum_text', None, ''),
+        ('Koordinatlar', 'coords_text', None, ''),
+    ],
+    tooltip=tooltips
+)
 
 # Renk barını haritaya ekle
 colormap.add_to(m)